@@ -92,11 +92,11 @@ def save_diagram(file, base_path):
     # Save as drawio
     drawio_path = os.path.join(base_path, "example.drawio")
     writer = DrawioWriter()
-    success = writer.write_file(file, drawio_path)
-    if success:
+    try:
+        writer.write_file(file, drawio_path)
         print(f"Diagram saved to {drawio_path}")
-    else:
-        print("Failed to save diagram as drawio")
+    except ValueError as e:
+        print(f"Failed to save diagram as drawio: {e}")
     
     # Render and save as SVG
     svg_path = os.path.join(base_path, "example.svg")
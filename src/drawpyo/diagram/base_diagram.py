@@ -1,4 +1,5 @@
 from ..xml_base import XMLBase
+from functools import lru_cache
 from os import path
 
 
@@ -118,6 +119,48 @@ def style_str_from_dict(style_dict):
     return ";".join(style_str)
 
 
+@lru_cache(maxsize=1024)
+def _parse_style_string(style_str):
+    """
+    Split a Draw.io style string into (name, value) pairs with the values
+    converted to Python types. A bare entry without an equals sign is the
+    base style and is returned with a name of None.
+
+    Diagrams tend to reuse a handful of style strings across many cells, so
+    the result is cached. It's a tuple of immutable values and safe to share.
+
+    Parameters
+    ----------
+    style_str : str
+        A Draw.io style string.
+
+    Returns
+    -------
+    tuple
+        The (name, value) pairs in the order they appear in the string.
+
+    """
+    parsed = []
+    for attrib in style_str.split(";"):
+        if attrib == "":
+            pass
+        elif "=" in attrib:
+            a_name = attrib.split("=")[0]
+            a_value = attrib.split("=")[1]
+            if a_value.isdigit():
+                if "." in a_value:
+                    a_value = float(a_value)
+                else:
+                    a_value = int(a_value)
+            elif a_value == "True" or a_value == "False":
+                a_value = bool(a_value)
+
+            parsed.append((a_name, a_value))
+        else:
+            parsed.append((None, attrib))
+    return tuple(parsed)
+
+
 class DiagramBase(XMLBase):
     """
     This class is the base for all diagram objects to inherit from. It defines some general creation methods and properties to make diagram objects printable and useful.
@@ -224,27 +267,28 @@ class DiagramBase(XMLBase):
 
         """
 
-        style_str = ""
-        if (
-            hasattr(self, "baseStyle")
-            and getattr(self, "baseStyle") is not None
-            and getattr(self, "baseStyle") != ""
-        ):
-            style_str = getattr(self, "baseStyle") + ";"
+        # Each attribute is looked up once and the pieces joined at the end,
+        # since this is read for every object whenever a diagram is written
+        # or rendered
+        style_str = []
+        base_style = getattr(self, "baseStyle", None)
+        if base_style is not None and base_style != "":
+            style_str.append(base_style + ";")
 
         # Add style attributes
         for attribute in self.style_attributes:
-            if hasattr(self, attribute) and getattr(self, attribute) is not None:
-                attr_val = getattr(self, attribute)
+            attr_val = getattr(self, attribute, None)
+            if attr_val is not None:
                 # reformat different datatypes to strings
                 if isinstance(attr_val, bool):
                     attr_val = format(attr_val * 1)
-                style_str = style_str + "{0}={1};".format(attribute, attr_val)
+                style_str.append("{0}={1};".format(attribute, attr_val))
 
         # Add style objects
-        if hasattr(self, "text_format") and self.text_format is not None:
-            style_str = style_str + self.text_format.style
-        return style_str
+        text_format = getattr(self, "text_format", None)
+        if text_format is not None:
+            style_str.append(text_format.style)
+        return "".join(style_str)
 
     def _add_and_set_style_attrib(self, attrib, value):
         if hasattr(self, attrib):
@@ -260,23 +304,11 @@ class DiagramBase(XMLBase):
         Args:
             style_str (str): A Draw.io style string
         """
-        for attrib in style_str.split(";"):
-            if attrib == "":
-                pass
-            elif "=" in attrib:
-                a_name = attrib.split("=")[0]
-                a_value = attrib.split("=")[1]
-                if a_value.isdigit():
-                    if "." in a_value:
-                        a_value = float(a_value)
-                    else:
-                        a_value = int(a_value)
-                elif a_value == "True" or a_value == "False":
-                    a_value = bool(a_value)
-
-                self._add_and_set_style_attrib(a_name, a_value)
+        for a_name, a_value in _parse_style_string(style_str):
+            if a_name is None:
+                self.baseStyle = a_value
             else:
-                self.baseStyle = attrib
+                self._add_and_set_style_attrib(a_name, a_value)
 
     def _apply_style_from_template(self, template):
         for attrib in template.style_attributes:
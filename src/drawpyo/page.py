@@ -14,8 +14,8 @@ class Page:
         self.objects = kwargs.get("objects", [])
 
         # There are two empty top level objects in every Draw.io diagram
-        self.objects.append(XMLBase(id=0, xml_class="mxCell"))
-        self.objects.append(XMLBase(id=1, xml_class="mxCell", xml_parent=0))
+        self.add_object(XMLBase(id=0, xml_class="mxCell"))
+        self.add_object(XMLBase(id=1, xml_class="mxCell", xml_parent=0))
 
         # Properties
 
@@ -56,12 +56,30 @@ class Page:
             self.file.remove_page(self)
         del self
 
+    @property
+    def objects(self):
+        """The list of objects on the page, in the order they are written.
+
+        Returns:
+            list: The objects on the page
+        """
+        return self._objects
+
+    @objects.setter
+    def objects(self, value):
+        self._objects = value
+        # Mirrors self._objects so add_object can check membership without
+        # scanning the whole list, which matters for pages with many cells
+        self._object_set = set(value)
+
     def add_object(self, obj):
-        if obj not in self.objects:
-            self.objects.append(obj)
+        if obj not in self._object_set:
+            self._object_set.add(obj)
+            self._objects.append(obj)
 
     def remove_object(self, obj):
-        self.objects.remove(obj)
+        self._objects.remove(obj)
+        self._object_set.discard(obj)
 
     @property
     def file(self):
@@ -16,19 +16,54 @@ drawio files and making them available for manipulation through the
 drawpyo API.
 
 Technical details:
-- Uses a two-pass approach: first creating all objects, then setting relationships
+- Walks the cells once, creating all objects, then binds the recorded
+  parent/source/target references
 - Maps cell IDs to drawpyo objects for reference resolution
 - Handles both vertex (shape) and edge (connector) elements
 - Applies styles from the drawio XML to drawpyo objects
+- Works directly on the elements produced by DrawioParser; CPython's
+  xml.etree.ElementTree is backed by the _elementtree C accelerator, so
+  find/findall/get already run in C without an extra dependency
 """
 
-import xml.etree.ElementTree as ET
 from ..diagram.objects import Object, BasicObject
 from ..diagram.edges import Edge, BasicEdge
 from ..page import Page
 from ..file import File
 
 
+# IDs of the two structural cells every diagram starts with: 0 is the
+# diagram root and 1 is the default parent
+_ROOT_IDS = frozenset(('0', '1'))
+
+
+def _read_geometry(geometry_attrib):
+    """
+    Read the x, y, width and height of an mxGeometry element as floats.
+    
+    Only attributes that are present are converted; omitted ones (commonly
+    x or y at the origin) fall back to float constants without a float()
+    call.
+    
+    Args:
+        geometry_attrib (dict): The attrib mapping of an mxGeometry element
+        
+    Returns:
+        tuple: (x, y, width, height) as floats
+    """
+    get = geometry_attrib.get
+    x = get('x')
+    y = get('y')
+    width = get('width')
+    height = get('height')
+    return (
+        0.0 if x is None else float(x),
+        0.0 if y is None else float(y),
+        120.0 if width is None else float(width),
+        60.0 if height is None else float(height),
+    )
+
+
 class XmlToPythonConverter:
     """
     Class for converting drawio XML elements to drawpyo objects.
@@ -61,21 +96,43 @@ class XmlToPythonConverter:
                 print(f"  Object: {obj}")
     """
     
-    def __init__(self):
+    def __init__(self, apply_styles=True):
         """
         Initialize the converter.
         
         Creates a new XmlToPythonConverter instance with an empty mapping
         of cell IDs to drawpyo objects.
         
-        The id_to_object dictionary is used during the conversion process
-        to keep track of created objects and establish relationships between
-        them.
+        The id_to_object dictionary is used during the conversion of each
+        diagram to keep track of created objects and establish relationships
+        between them. It's emptied again once the diagram's Page is built.
+        
+        Args:
+            apply_styles (bool): Whether each cell's style string is applied
+                to its object during conversion. Workloads that only look at
+                geometry or topology can pass False to skip style parsing;
+                the untouched string is then kept on the object's raw_style
+                attribute and can be applied later with
+                obj.apply_style_string(obj.raw_style).
         
         Example:
             converter = XmlToPythonConverter()
+            lazy_converter = XmlToPythonConverter(apply_styles=False)
         """
         self.id_to_object = {}  # Maps cell IDs to drawpyo objects
+        self._pending_edges = []  # (edge, source ID, target ID) to bind
+        self.apply_styles = apply_styles
+        
+        # Maps a cell's (edge, vertex) attribute pair to the method that
+        # builds its object. Anything not listed becomes a BasicObject,
+        # but only if it's a layer or another cell refers to it.
+        self._cell_builders = {
+            ('1', None): self._create_edge_from_cell,
+            ('1', '0'): self._create_edge_from_cell,
+            ('1', '1'): self._create_edge_from_cell,
+            (None, '1'): self._create_vertex_from_cell,
+            ('0', '1'): self._create_vertex_from_cell,
+        }
     
     def convert_file(self, parsed_data):
         """
@@ -129,6 +186,10 @@ class XmlToPythonConverter:
         file.type = file_info.get('type', 'device')
         
         # Convert each diagram to a Page
+        # Pages are converted serially on purpose: a process pool would have
+        # to pickle every page's object graph back to the parent, which costs
+        # more than the conversion itself, and threads would only contend
+        # for the GIL on this pure-Python work
         for diagram_data in parsed_data['diagrams']:
             page = self.convert_diagram(diagram_data)
             file.add_page(page)
@@ -163,79 +224,194 @@ class XmlToPythonConverter:
                 print(f"Object: {obj}")
         """
         # Create a new drawpyo Page with the diagram name
-        page = Page(diagram_data['name'])
+        page = Page(name=diagram_data['name'])
         
         # Reset the ID to object mapping for this diagram
         # This ensures that IDs from different diagrams don't conflict
         self.id_to_object = {}
         
-        # Get the mxGraphModel element (root of the diagram content)
-        graph_model = diagram_data['content']
+        # Edges with the source/target IDs they refer to, recorded by
+        # _create_edge_from_cell
+        self._pending_edges = []
+        
+        try:
+            self._convert_cells(diagram_data['content'], page)
+        finally:
+            # Drop the lookups once the page is built, so a converter that
+            # is kept around doesn't hold on to the last diagram's objects
+            self.id_to_object = {}
+            self._pending_edges = []
         
+        return page
+    
+    def _convert_cells(self, graph_model, page):
+        """
+        Create the objects and edges of a diagram and link them together.
+        
+        Args:
+            graph_model (Element): The diagram's mxGraphModel element
+            page (Page): The drawpyo Page to add the objects to
+        """
         # Get the root element containing all cells
         root = graph_model.find('root')
         if root is None:
-            # If there's no root element, return an empty page
-            return page
+            # If there's no root element, the page stays empty
+            return
         
-        # First pass: create all objects
-        # This creates all Objects and Edges but doesn't set relationships yet
-        for cell in root.findall('mxCell'):
-            self._create_object_from_cell(cell, page)
+        # Single pass over the cells: create every Object and Edge, and
+        # remember the parent ID each one refers to (edges also record their
+        # source and target). Those references can point forward in the
+        # document, so they are bound once all objects exist.
+        # The per-cell dispatch is inlined with its lookups bound to locals,
+        # since this loop runs once for every cell in the diagram
+        pending = []
+        append_pending = pending.append
+        placeholders = {}
+        id_to_object = self.id_to_object
+        get_builder = self._cell_builders.get
+        # Walking the children directly avoids going through ElementPath
+        # selector matching for what is a plain tag comparison
+        for cell in root:
+            if cell.tag != 'mxCell':
+                continue
+            attrib = cell.attrib
+            cell_id = attrib.get('id')
+            
+            # Skip the root cells (0 and 1)
+            # Cell 0 is the diagram root, Cell 1 is the default parent
+            if cell_id in _ROOT_IDS:
+                continue
+            
+            # Pick the builder for an edge (connector) or a vertex (shape)
+            # from a single lookup on the edge/vertex flags. Anything else
+            # (layers, metadata) is decided once the loop is done, so its
+            # position among the page's objects is remembered.
+            builder = get_builder((attrib.get('edge'), attrib.get('vertex')))
+            if builder is None:
+                placeholders[cell_id] = (cell, len(page.objects), len(pending))
+                continue
+            obj = builder(cell, page)
+            id_to_object[cell_id] = obj
+            append_pending((obj, attrib.get('parent')))
+        
+        if placeholders:
+            self._create_referenced_placeholders(placeholders, pending, page)
+        
+        # Bind parent-child relationships. The lookup is bound once for the
+        # whole pass.
+        get_obj = self.id_to_object.get
+        for obj, parent_id in pending:
+            # Cells parented to the root or default parent (0 and 1) stay
+            # at the top level of the page
+            if parent_id and parent_id not in _ROOT_IDS:
+                parent_obj = get_obj(parent_id)
+                if parent_obj:
+                    obj.parent = parent_obj
+        
+        # Connect edges to their sources and targets
+        for edge, source_id, target_id in self._pending_edges:
+            if source_id:
+                source_obj = get_obj(source_id)
+                if source_obj:
+                    edge.source = source_obj
+            if target_id:
+                target_obj = get_obj(target_id)
+                if target_obj:
+                    edge.target = target_obj
+    
+    def _create_referenced_placeholders(self, placeholders, pending, page):
+        """
+        Create placeholder objects for the skipped cells worth keeping.
         
-        # Second pass: set parent-child relationships and connect edges
-        # This sets the parent-child hierarchy and connects edges to their sources and targets
-        for cell in root.findall('mxCell'):
-            self._set_relationships(cell)
+        Cells that are neither vertices nor edges get an object when they
+        are layers (children of cell 0) or when another cell uses them as
+        its parent, source or target. That includes placeholders referenced
+        by other kept placeholders, such as a group inside a layer. Any
+        other such cell refers to nothing on the page and is dropped.
         
-        return page
+        The created objects are registered in id_to_object and inserted
+        into page.objects and pending at the cell's position in the
+        document.
+        
+        Args:
+            placeholders (dict): Skipped cells keyed by cell ID, as
+                (mxCell element, index in page.objects, index in pending)
+                in document order
+            pending (list): (object, parent ID) pairs still to be bound
+            page (Page): The drawpyo Page to add the objects to
+        """
+        referenced = {parent_id for _, parent_id in pending}
+        for _, source_id, target_id in self._pending_edges:
+            referenced.add(source_id)
+            referenced.add(target_id)
+        
+        # Keep layers and referenced cells, and follow parent chains
+        # between placeholders
+        needed = set()
+        stack = [
+            cell_id
+            for cell_id, (cell, _, _) in placeholders.items()
+            if cell_id in referenced or cell.attrib.get('parent') == '0'
+        ]
+        while stack:
+            cell_id = stack.pop()
+            if cell_id in needed:
+                continue
+            needed.add(cell_id)
+            parent_id = placeholders[cell_id][0].attrib.get('parent')
+            if parent_id in placeholders:
+                stack.append(parent_id)
+        
+        # Each object is created at the end of the page and moved back to
+        # its place. Earlier insertions shift the later positions by one
+        objects = page.objects
+        inserted = 0
+        for cell_id, (cell, object_index, pending_index) in placeholders.items():
+            if cell_id in needed:
+                obj = self._create_basic_from_cell(cell, page)
+                self.id_to_object[cell_id] = obj
+                objects.pop()
+                objects.insert(object_index + inserted, obj)
+                pending.insert(
+                    pending_index + inserted, (obj, cell.attrib.get('parent'))
+                )
+                inserted += 1
     
-    def _create_object_from_cell(self, cell, page):
+    def _create_basic_from_cell(self, cell, page):
         """
-        Create a drawpyo object from an mxCell element.
-        
-        This method examines an mxCell element and creates the appropriate
-        drawpyo object (Object or Edge) based on its attributes.
+        Create a placeholder drawpyo object for an mxCell that is neither a
+        vertex nor an edge.
         
         Args:
             cell (Element): An mxCell XML element
             page (Page): The drawpyo Page to add the object to
             
         Returns:
-            Object or Edge: The created drawpyo object, or None for special cells
+            BasicObject: The created placeholder object
             
         Note:
-            This method is part of the first pass of the conversion process.
-            It creates objects but doesn't set relationships between them.
+            Such cells are usually layers, groups or other special
+            elements. They are kept so that layers survive a round trip and
+            children and edges referencing them still resolve.
+        """
+        return BasicObject(page=page)
+    
+    def _apply_style(self, obj, style):
         """
-        cell_id = cell.get('id')
-        
-        # Skip the root cells (0 and 1)
-        # Cell 0 is the diagram root, Cell 1 is the default parent
-        if cell_id in ('0', '1'):
-            return None
-        
-        # Check if it's an edge or a vertex
-        is_edge = cell.get('edge') == '1'
-        is_vertex = cell.get('vertex') == '1'
-        
-        if is_edge:
-            # Create an edge (connector)
-            edge = self._create_edge_from_cell(cell, page)
-            self.id_to_object[cell_id] = edge
-            return edge
-        elif is_vertex:
-            # Create a vertex (shape)
-            obj = self._create_vertex_from_cell(cell, page)
-            self.id_to_object[cell_id] = obj
-            return obj
+        Apply a cell's style string to its object, or defer it.
+        
+        When the converter was created with apply_styles=False the string
+        is only stored on obj.raw_style, so no style parsing happens unless
+        the caller asks for it.
+        
+        Args:
+            obj (DiagramBase): The object created from the cell
+            style (str): The cell's style attribute
+        """
+        if self.apply_styles:
+            obj.apply_style_string(style)
         else:
-            # It might be a group or other special element
-            # For now, create a basic object
-            obj = BasicObject()
-            obj.page = page
-            self.id_to_object[cell_id] = obj
-            return obj
+            obj.raw_style = style
     
     def _create_vertex_from_cell(self, cell, page):
         """
@@ -257,32 +433,31 @@ class XmlToPythonConverter:
             and sets their position, size, and style properties.
         """
         # Get basic attributes
-        cell_id = cell.get('id')
-        value = cell.get('value', '')
-        style = cell.get('style', '')
+        attrib = cell.attrib
+        value = attrib.get('value', '')
+        style = attrib.get('style')
         
-        # Create a basic object with the cell's value as its text
-        obj = Object(value=value)
-        obj.page = page
+        # Read the geometry first so the object can be built with its page,
+        # position and size in one constructor call instead of being
+        # initialized with defaults and then reassigned
+        geometry = cell.find('mxGeometry')
+        if geometry is not None:
+            # Extract position and size from the geometry element
+            x, y, width, height = _read_geometry(geometry.attrib)
+            obj = Object(
+                value=value,
+                page=page,
+                position=(x, y),
+                width=width,
+                height=height,
+            )
+        else:
+            obj = Object(value=value, page=page)
         
         # Apply style if present
         # This sets properties like fillColor, strokeColor, etc.
         if style:
-            obj.apply_style_string(style)
-        
-        # Set geometry if present
-        geometry = cell.find('mxGeometry')
-        if geometry is not None:
-            # Extract position and size from the geometry element
-            x = float(geometry.get('x', 0))
-            y = float(geometry.get('y', 0))
-            width = float(geometry.get('width', 120))
-            height = float(geometry.get('height', 60))
-            
-            # Set position and size on the object
-            obj.position = (x, y)
-            obj.width = width
-            obj.height = height
+            self._apply_style(obj, style)
         
         return obj
     
@@ -302,76 +477,26 @@ class XmlToPythonConverter:
             
         Note:
             This method handles the conversion of connectors (lines, arrows, etc.)
-            but doesn't set their source and target objects yet. That happens in
-            the second pass during _set_relationships.
+            but doesn't set their source and target objects yet. That happens
+            in convert_diagram once every cell has been created.
         """
         # Get basic attributes
-        value = cell.get('value', '')
-        style = cell.get('style', '')
+        attrib = cell.attrib
+        value = attrib.get('value', '')
+        style = attrib.get('style')
         
         # Create a basic edge with the cell's value as its label
-        edge = Edge(label=value)
-        edge.page = page
+        edge = Edge(label=value, page=page)
         
         # Apply style if present
         # This sets properties like strokeColor, endArrow, etc.
         if style:
-            edge.apply_style_string(style)
+            self._apply_style(edge, style)
         
-        # Source and target will be set in the second pass
-        # during _set_relationships
+        # Source and target are bound by convert_diagram once all cells
+        # have been created, so only their IDs are recorded here
+        self._pending_edges.append(
+            (edge, attrib.get('source'), attrib.get('target'))
+        )
         
         return edge
-    
-    def _set_relationships(self, cell):
-        """
-        Set parent-child relationships and connect edges.
-        
-        This method is part of the second pass of the conversion process.
-        It sets parent-child relationships between objects and connects
-        edges to their source and target objects.
-        
-        Args:
-            cell (Element): An mxCell XML element
-            
-        Note:
-            This method relies on the id_to_object dictionary populated
-            during the first pass to resolve references between objects.
-        """
-        cell_id = cell.get('id')
-        
-        # Skip the root cells (0 and 1)
-        if cell_id in ('0', '1'):
-            return
-        
-        # Get the object corresponding to this cell
-        obj = self.id_to_object.get(cell_id)
-        if obj is None:
-            # If the object wasn't created in the first pass, skip it
-            return
-        
-        # Set parent relationship
-        parent_id = cell.get('parent')
-        if parent_id and parent_id not in ('0', '1'):
-            # If the parent is not the root or default parent,
-            # set the parent-child relationship
-            parent_obj = self.id_to_object.get(parent_id)
-            if parent_obj:
-                obj.parent = parent_obj
-        
-        # If it's an edge, set source and target
-        if isinstance(obj, Edge):
-            source_id = cell.get('source')
-            target_id = cell.get('target')
-            
-            # Set the source object if specified
-            if source_id:
-                source_obj = self.id_to_object.get(source_id)
-                if source_obj:
-                    obj.source = source_obj
-            
-            # Set the target object if specified
-            if target_id:
-                target_obj = self.id_to_object.get(target_id)
-                if target_obj:
-                    obj.target = target_obj
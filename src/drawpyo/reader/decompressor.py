@@ -13,14 +13,63 @@ Technical details:
 - Deflate compression: Uses the zlib library without headers (raw deflate)
 - The decompression process: base64 decode -> zlib decompress
 - The compression process: zlib compress -> base64 encode
+- Base64 goes straight through binascii, the C codec behind the base64
+  module, which skips base64's argument normalization and the extra ASCII
+  encode of str input
+- compress_element deflates an XML element while ElementTree serializes it,
+  so the uncompressed document is never held in memory
 
 The DrawioDecompressor class provides static methods for these operations,
 making it easy to use without instantiation.
 """
 
-import base64
+import binascii
+import re
+import string
+import xml.etree.ElementTree as ET
 import zlib
 
+# Translation table deleting every character that may appear in a base64
+# payload (including padding and line breaks); whatever survives
+# str.translate is outside the alphabet
+_BASE64_DELETE_TABLE = str.maketrans(
+    "", "", string.ascii_letters + string.digits + "+/=" + string.whitespace
+)
+
+# Finds where the content starts after any leading whitespace, without
+# copying the rest of it the way lstrip would
+_NON_SPACE = re.compile(r"\S")
+
+# Number of leading characters (after whitespace) is_compressed checks
+# against the base64 alphabet
+_PREFIX_LENGTH = 16
+
+# Expected ratio of inflated to deflated size, used to pre-size output
+# buffers, and the largest buffer that is reserved up front on that guess
+_EXPANSION_HINT = 20
+_MAX_INITIAL_BUFFER = 1 << 24
+
+
+class _DeflateSink:
+    """
+    File-like object that deflates everything written to it.
+    
+    ElementTree serializes into it chunk by chunk, so a document can be
+    compressed without its uncompressed bytes ever being held in full.
+    """
+    
+    def __init__(self, level=9):
+        self.deflater = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.chunks = []
+    
+    def write(self, data):
+        self.chunks.append(self.deflater.compress(data))
+        return len(data)
+    
+    def getvalue(self):
+        self.chunks.append(self.deflater.flush())
+        return b"".join(self.chunks)
+
 
 class DrawioDecompressor:
     """
@@ -50,8 +99,9 @@ class DrawioDecompressor:
         Check if the content appears to be compressed.
         
         This method uses heuristics to determine if the content is likely
-        to be base64 encoded. It checks for XML tags (which would indicate
-        uncompressed content) and attempts to decode the content as base64.
+        to be base64 encoded. It checks whether the content starts with an
+        XML tag (which would indicate uncompressed content) and whether it
+        starts with characters of the base64 alphabet.
         
         Args:
             content (str): The content to check
@@ -68,16 +118,19 @@ class DrawioDecompressor:
                 # Content is already in XML format
                 xml_content = diagram_content
         """
-        # Simple heuristic: if it contains XML tags, it's probably not compressed
-        if "<" in content and ">" in content:
-            return False
+        # Only the leading whitespace and the first characters after it are
+        # inspected, so large payloads are never scanned in full; decompress
+        # does the authoritative validation when it decodes them
+        match = _NON_SPACE.search(content)
+        start = match.start() if match else len(content)
+        head = content[start:start + _PREFIX_LENGTH]
         
-        # Try to decode as base64 to see if it's valid
-        try:
-            base64.b64decode(content)
-            return True
-        except:
+        # Uncompressed content is XML, which starts with a tag
+        if head.startswith("<"):
             return False
+        
+        # Otherwise check the leading characters against the base64 alphabet
+        return not head.translate(_BASE64_DELETE_TABLE)
     
     @staticmethod
     def decompress(content):
@@ -107,22 +160,99 @@ class DrawioDecompressor:
             except ValueError as e:
                 print(f"Error: {e}")
         """
+        try:
+            # Convert to string
+            return DrawioDecompressor.decompress_bytes(content).decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Failed to decompress content: {str(e)}") from e
+    
+    @staticmethod
+    def decompress_bytes(content):
+        """
+        Decompress base64+deflate content without decoding it to a string.
+        
+        XML parsers accept the UTF-8 bytes directly, so handing them the
+        result of this method avoids decoding the document to a str only
+        for the parser to encode it again.
+        
+        Args:
+            content (str or bytes): The compressed content (base64 encoded)
+            
+        Returns:
+            bytes: The decompressed UTF-8 content
+            
+        Raises:
+            ValueError: If the content cannot be decompressed
+            
+        Example:
+            root = ET.fromstring(DrawioDecompressor.decompress_bytes(compressed_content))
+        """
         try:
             # Decode base64
-            decoded = base64.b64decode(content)
+            decoded = binascii.a2b_base64(content)
             
             # Decompress with zlib (deflate)
             # -zlib.MAX_WBITS tells zlib that there is no zlib header
             # This is necessary for raw deflate data
-            decompressed = zlib.decompress(decoded, -zlib.MAX_WBITS)
+            # Diagram XML typically inflates 10-20x, so start the output
+            # buffer near that size instead of letting zlib grow it stepwise.
+            # The guess is capped so large payloads that compress poorly
+            # don't reserve far more memory than they need
+            bufsize = min(len(decoded) * _EXPANSION_HINT, _MAX_INITIAL_BUFFER)
+            return zlib.decompress(decoded, -zlib.MAX_WBITS, bufsize)
+        except (ValueError, zlib.error) as e:
+            raise ValueError(f"Failed to decompress content: {str(e)}") from e
+    
+    @staticmethod
+    def iter_decompress(content, chunk_size=65536):
+        """
+        Decompress base64+deflate content incrementally.
+        
+        This is the streaming counterpart of decompress. Instead of building
+        the whole decompressed document in memory, it yields the inflated
+        bytes in chunks of at most chunk_size, so they can be fed straight
+        into an incremental XML parser.
+        
+        Args:
+            content (str): The compressed content (base64 encoded string)
+            chunk_size (int): Maximum number of bytes yielded at a time
             
-            # Convert to string
-            return decompressed.decode('utf-8')
-        except Exception as e:
-            raise ValueError(f"Failed to decompress content: {str(e)}")
+        Yields:
+            bytes: Consecutive chunks of the decompressed UTF-8 content
+            
+        Raises:
+            ValueError: If the content cannot be decompressed
+            
+        Example:
+            parser = ET.XMLParser()
+            for chunk in DrawioDecompressor.iter_decompress(compressed_content):
+                parser.feed(chunk)
+            root = parser.close()
+        """
+        try:
+            decoded = binascii.a2b_base64(content)
+            inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+            
+            # Bound each output chunk; whatever does not fit is left in
+            # unconsumed_tail and inflated on the next pass
+            chunk = inflater.decompress(decoded, chunk_size)
+            while chunk:
+                yield chunk
+                chunk = inflater.decompress(inflater.unconsumed_tail, chunk_size)
+            
+            tail = inflater.flush()
+            if tail:
+                yield tail
+            
+            # Running out of input before the final deflate block means the
+            # content was cut short, not that the document is complete
+            if not inflater.eof:
+                raise zlib.error("truncated stream")
+        except (ValueError, zlib.error) as e:
+            raise ValueError(f"Failed to decompress content: {str(e)}") from e
     
     @staticmethod
-    def compress(content):
+    def compress(content, level=9):
         """
         Compress content using deflate and encode with base64.
         
@@ -134,6 +264,8 @@ class DrawioDecompressor:
         
         Args:
             content (str or bytes): The content to compress
+            level (int): The zlib compression level, from 1 (fastest) to 9
+                (smallest output). 0 stores the data uncompressed.
             
         Returns:
             str: The compressed content as a base64 string
@@ -155,14 +287,50 @@ class DrawioDecompressor:
             
             # Compress with zlib (deflate)
             # -zlib.MAX_WBITS tells zlib not to add a zlib header
-            # This produces raw deflate data as used by drawio
-            # The [2:-4] removes the zlib header and checksum
-            compressed = zlib.compress(content, 9)[2:-4]
+            # This produces raw deflate data as used by drawio, without
+            # computing a checksum or copying the output to strip it
+            deflater = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            compressed = deflater.compress(content) + deflater.flush()
+            
+            # Encode as base64
+            encoded = binascii.b2a_base64(compressed, newline=False)
+            
+            # Convert to string
+            return encoded.decode('utf-8')
+        except (TypeError, ValueError, zlib.error) as e:
+            raise ValueError(f"Failed to compress content: {str(e)}") from e
+    
+    @staticmethod
+    def compress_element(element, level=9):
+        """
+        Serialize an XML element and compress it in a single pass.
+        
+        This gives the same result as compressing the element's UTF-8
+        serialization with compress, but the XML is deflated as it's
+        written, so the uncompressed document is never built in memory.
+        
+        Args:
+            element (Element): The XML Element to serialize and compress
+            level (int): The zlib compression level, as for compress
+            
+        Returns:
+            str: The compressed content as a base64 string
+            
+        Raises:
+            ValueError: If the content cannot be compressed
+            
+        Example:
+            diagram_elem.text = DrawioDecompressor.compress_element(graph_model)
+        """
+        try:
+            # Serialize into the deflater
+            sink = _DeflateSink(level)
+            ET.ElementTree(element).write(sink, encoding="utf-8")
             
             # Encode as base64
-            encoded = base64.b64encode(compressed)
+            encoded = binascii.b2a_base64(sink.getvalue(), newline=False)
             
             # Convert to string
             return encoded.decode('utf-8')
-        except Exception as e:
-            raise ValueError(f"Failed to compress content: {str(e)}")
+        except (TypeError, ValueError, zlib.error) as e:
+            raise ValueError(f"Failed to compress content: {str(e)}") from e
@@ -18,12 +18,93 @@ Technical details:
 - The parser uses xml.etree.ElementTree for XML parsing
 - It extracts file metadata (host, version, etc.) from the mxfile element
 - It handles multiple diagrams (pages) in a single file
-- It automatically detects and decompresses compressed content
+- It automatically detects and decompresses compressed content, feeding the
+  inflated chunks straight into an incremental XML parser
+- Uncompressed diagrams are read from their inline mxGraphModel element
 """
 
+import io
+import mmap
+import os
+import stat
 import xml.etree.ElementTree as ET
+from collections.abc import Mapping
 from .decompressor import DrawioDecompressor
 
+# Files up to this size are read into memory in one call, larger ones are
+# memory-mapped
+_MMAP_THRESHOLD = 1 << 20
+
+
+class _DiagramEntry(Mapping):
+    """
+    Parsed diagram information, as a read-only mapping with 'id', 'name'
+    and 'content'.
+    
+    A compressed diagram only keeps its raw text until 'content' is first
+    read, through any of the usual mapping operations (indexing, get,
+    items, dict(entry), ...). It's then decompressed and parsed once and
+    the element is kept. Uncompressed diagrams carry the mxGraphModel as a
+    child element, which is stored as the content right away.
+    """
+    
+    _KEYS = ('id', 'name', 'content')
+    
+    def __init__(self, parser, diagram_elem):
+        self._parser = parser
+        self._id = diagram_elem.get('id', '')
+        self._name = diagram_elem.get('name', '')
+        self._text = None
+        
+        self._content = diagram_elem.find('mxGraphModel')
+        if self._content is None:
+            # The text is a separate string that outlives the element
+            self._text = diagram_elem.text or ''
+    
+    def __getitem__(self, key):
+        if key == 'content':
+            return self._get_content()
+        if key == 'id':
+            return self._id
+        if key == 'name':
+            return self._name
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(self._KEYS)
+    
+    def __len__(self):
+        return len(self._KEYS)
+    
+    def __contains__(self, key):
+        # Answered without parsing the content
+        return key in self._KEYS
+    
+    def __repr__(self):
+        return f"<diagram entry id={self._id!r} name={self._name!r}>"
+    
+    def copy(self):
+        """
+        Get the entry as a plain dict, with its content parsed.
+        
+        Returns:
+            dict: The 'id', 'name' and 'content' of the diagram
+        """
+        return dict(self)
+    
+    def _get_content(self):
+        content = self._content
+        if content is None:
+            text = self._text
+            if text is None:
+                # Another thread parsed the content in the meantime
+                return self._content
+            
+            content = self._parser._parse_diagram_text(text, self._name)
+            self._content = content
+            self._text = None
+        return content
+
 
 class DrawioParser:
     """
@@ -65,7 +146,7 @@ class DrawioParser:
         """
         self.decompressor = DrawioDecompressor()
     
-    def parse_file(self, file_path):
+    def parse_file(self, file_path, lazy=False):
         """
         Parse a drawio file and extract its content.
         
@@ -75,6 +156,11 @@ class DrawioParser:
         
         Args:
             file_path (str): Path to the drawio file
+            lazy (bool): Leave each compressed diagram's content to be
+                decompressed and parsed the first time it's read, so pages
+                that are never looked at cost nothing. Errors in that content
+                are then raised on that first read instead of from here.
+                The diagrams are read-only mappings rather than dicts.
             
         Returns:
             dict: A dictionary containing the parsed content with the following structure:
@@ -90,7 +176,7 @@ class DrawioParser:
                         {
                             'id': str,      # Diagram identifier
                             'name': str,    # Diagram name
-                            'content': Element  # XML Element representing the mxGraphModel
+                            'content': Element  # The mxGraphModel
                         },
                         ...
                     ]
@@ -115,67 +201,41 @@ class DrawioParser:
                 print(f"Error parsing file: {e}")
         """
         try:
-            # Parse the XML file
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            # Verify that it's a drawio file
-            if root.tag != 'mxfile':
-                raise ValueError("Not a valid drawio file: root element is not 'mxfile'")
-            
-            # Extract file information from the root element
-            file_info = {
-                'host': root.get('host', ''),
-                'modified': root.get('modified', ''),
-                'agent': root.get('agent', ''),
-                'version': root.get('version', ''),
-                'type': root.get('type', '')
-            }
-            
-            # Extract diagrams
-            diagrams = []
-            for diagram_elem in root.findall('diagram'):
-                # Get diagram attributes
-                diagram_id = diagram_elem.get('id', '')
-                diagram_name = diagram_elem.get('name', '')
-                
-                # Get diagram content (may be compressed)
-                content = diagram_elem.text.strip() if diagram_elem.text else ''
-                
-                # Check if content is compressed and decompress if necessary
-                if self.decompressor.is_compressed(content):
-                    try:
-                        content = self.decompressor.decompress(content)
-                    except ValueError as e:
-                        raise ValueError(f"Failed to decompress diagram '{diagram_name}': {str(e)}")
+            fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                status = os.fstat(fd)
+                if not stat.S_ISREG(status.st_mode):
+                    # Pipes and devices report no useful size and can't be
+                    # mapped, so they're parsed as a stream until EOF
+                    with open(fd, 'rb', closefd=False) as f:
+                        return self._parse_source(f, 'file', lazy)
                 
-                # Parse the content as XML
-                try:
-                    content_root = ET.fromstring(content)
-                except ET.ParseError as e:
-                    raise ValueError(f"Failed to parse diagram content as XML: {str(e)}")
+                if status.st_size <= _MMAP_THRESHOLD:
+                    # Small files are read whole, which is cheaper than
+                    # setting up a mapping. readall keeps reading until EOF
+                    # in case a read comes back short
+                    data = io.FileIO(fd, closefd=False).readall()
+                    return self._parse_source(io.BytesIO(data), 'file', lazy)
                 
-                # Add the diagram to the list
-                diagrams.append({
-                    'id': diagram_id,
-                    'name': diagram_name,
-                    'content': content_root
-                })
-            
-            # Return the parsed data
-            return {
-                'file_info': file_info,
-                'diagrams': diagrams
-            }
+                # Larger files are memory-mapped so the parser reads straight
+                # from the page cache rather than through a copy
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        # The parser reads front to back, so let the OS read
+                        # ahead and drop pages behind it
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    return self._parse_source(mapped, 'file', lazy)
+            finally:
+                os.close(fd)
             
         except ET.ParseError as e:
             # Handle XML parsing errors
-            raise ValueError(f"Failed to parse file as XML: {str(e)}")
-        except Exception as e:
-            # Handle other errors
-            raise ValueError(f"Failed to parse drawio file: {str(e)}")
+            raise ValueError(f"Failed to parse file as XML: {str(e)}") from e
+        except (OSError, ValueError) as e:
+            # Handle unreadable files and invalid drawio content
+            raise ValueError(f"Failed to parse drawio file: {str(e)}") from e
     
-    def parse_xml_string(self, xml_string):
+    def parse_xml_string(self, xml_string, lazy=False):
         """
         Parse a drawio XML string and extract its content.
         
@@ -185,6 +245,7 @@ class DrawioParser:
         
         Args:
             xml_string (str): The drawio XML string
+            lazy (bool): Parse diagram content on first access, as for parse_file
             
         Returns:
             dict: A dictionary containing the parsed content (same structure as parse_file)
@@ -208,61 +269,119 @@ class DrawioParser:
                 print(f"Error parsing XML: {e}")
         """
         try:
-            # Parse the XML string
-            root = ET.fromstring(xml_string)
+            if isinstance(xml_string, bytes):
+                source = io.BytesIO(xml_string)
+            else:
+                source = io.StringIO(xml_string)
+            return self._parse_source(source, 'XML', lazy)
             
-            # Verify that it's a drawio file
-            if root.tag != 'mxfile':
-                raise ValueError("Not a valid drawio XML: root element is not 'mxfile'")
+        except ET.ParseError as e:
+            # Handle XML parsing errors
+            raise ValueError(f"Failed to parse string as XML: {str(e)}") from e
+        except (TypeError, ValueError) as e:
+            # Handle non-string input and invalid drawio content
+            raise ValueError(f"Failed to parse drawio XML string: {str(e)}") from e
+    
+    def _parse_source(self, source, source_kind, lazy=False):
+        """
+        Parse an mxfile document from a file-like source.
+        
+        This is the shared implementation of parse_file and parse_xml_string.
+        The document is streamed so each diagram can be released as soon as
+        its content has been extracted, instead of keeping the whole mxfile
+        tree alive next to the parsed diagram models.
+        
+        Args:
+            source (file-like): A binary or text stream of the mxfile XML
+            source_kind (str): How the source is described in error messages
+            lazy (bool): Leave compressed diagram content unparsed until read
             
-            # Extract file information from the root element
-            file_info = {
-                'host': root.get('host', ''),
-                'modified': root.get('modified', ''),
-                'agent': root.get('agent', ''),
-                'version': root.get('version', ''),
-                'type': root.get('type', '')
-            }
+        Returns:
+            dict: The parsed content, as described in parse_file
             
-            # Extract diagrams
-            diagrams = []
-            for diagram_elem in root.findall('diagram'):
-                # Get diagram attributes
-                diagram_id = diagram_elem.get('id', '')
-                diagram_name = diagram_elem.get('name', '')
-                
-                # Get diagram content (may be compressed)
-                content = diagram_elem.text.strip() if diagram_elem.text else ''
-                
-                # Check if content is compressed and decompress if necessary
-                if self.decompressor.is_compressed(content):
-                    try:
-                        content = self.decompressor.decompress(content)
-                    except ValueError as e:
-                        raise ValueError(f"Failed to decompress diagram '{diagram_name}': {str(e)}")
-                
-                # Parse the content as XML
-                try:
-                    content_root = ET.fromstring(content)
-                except ET.ParseError as e:
-                    raise ValueError(f"Failed to parse diagram content as XML: {str(e)}")
-                
-                # Add the diagram to the list
-                diagrams.append({
-                    'id': diagram_id,
-                    'name': diagram_name,
-                    'content': content_root
-                })
+        Raises:
+            ValueError: If the root element is not an mxfile, or (unless lazy)
+                a diagram's content cannot be decompressed or parsed
+            ET.ParseError: If the source is not well-formed XML
+        """
+        root = None
+        file_info = None
+        diagrams = []
+        depth = 0
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if root is None:
+                    root = elem
+                    
+                    # Verify that it's a drawio file
+                    if root.tag != 'mxfile':
+                        raise ValueError(f"Not a valid drawio {source_kind}: root element is not 'mxfile'")
+                    
+                    # Extract file information from the root element
+                    file_info = {
+                        'host': root.get('host', ''),
+                        'modified': root.get('modified', ''),
+                        'agent': root.get('agent', ''),
+                        'version': root.get('version', ''),
+                        'type': root.get('type', '')
+                    }
+                continue
+            
+            depth -= 1
+            # Only diagrams directly under mxfile are pages
+            if depth != 1 or elem.tag != 'diagram':
+                continue
             
-            # Return the parsed data
-            return {
-                'file_info': file_info,
-                'diagrams': diagrams
-            }
+            # Add the diagram to the list
+            diagram = _DiagramEntry(self, elem)
+            if not lazy:
+                # Parse the content now, so errors surface from the parse,
+                # and hand back a plain dict
+                diagram = dict(diagram)
+            diagrams.append(diagram)
             
+            # The diagram's content has been extracted, free it
+            root.remove(elem)
+            elem.clear()
+        
+        # Return the parsed data
+        return {
+            'file_info': file_info,
+            'diagrams': diagrams
+        }
+    
+    def _parse_diagram_text(self, content, diagram_name):
+        """
+        Parse the text content of a diagram into its mxGraphModel element.
+        
+        Compressed content is inflated in chunks that are fed directly into
+        an incremental XML parser, so the decompressed document is never
+        held in memory as one string.
+        
+        Args:
+            content (str): The text of a diagram XML element
+            diagram_name (str): The diagram's name, used in error messages
+            
+        Returns:
+            Element: The XML Element representing the mxGraphModel
+            
+        Raises:
+            ValueError: If the content cannot be decompressed or parsed
+        """
+        # The text is not stripped up front: the base64 decoder skips
+        # surrounding whitespace on its own, so only the uncompressed case
+        # pays for the copy
+        try:
+            if not DrawioDecompressor.is_compressed(content):
+                return ET.fromstring(content.strip())
+            
+            xml_parser = ET.XMLParser()
+            feed = xml_parser.feed
+            for chunk in DrawioDecompressor.iter_decompress(content):
+                feed(chunk)
+            return xml_parser.close()
         except ET.ParseError as e:
-            # Handle XML parsing errors
-            raise ValueError(f"Failed to parse string as XML: {str(e)}")
-        except Exception as e:
-            # Handle other errors
-            raise ValueError(f"Failed to parse drawio XML string: {str(e)}")
+            raise ValueError(f"Failed to parse diagram content as XML: {str(e)}") from e
+        except ValueError as e:
+            raise ValueError(f"Failed to decompress diagram '{diagram_name}': {str(e)}") from e
@@ -24,9 +24,26 @@ Technical details:
 - Handles both file paths and XML strings as input
 """
 
+import os
+import threading
+from collections import OrderedDict
+
 from .parser import DrawioParser
 from .converter import XmlToPythonConverter
 
+# The readers behind the class methods, one per class in each thread. The
+# converter keeps per-diagram state while it runs, so threads each get their
+# own rather than taking turns with one
+_SHARED_READERS = threading.local()
+
+# Parsed files read with use_cache=True, keyed by (absolute path, mtime,
+# size), most recently used last. Only the parse is cached: the converter
+# reads the parsed elements without changing them and builds fresh objects
+# on every call, so callers never share a File
+_FILE_CACHE = OrderedDict()
+_FILE_CACHE_SIZE = 32
+_FILE_CACHE_LOCK = threading.Lock()
+
 
 class DrawioReader:
     """
@@ -76,7 +93,7 @@ class DrawioReader:
         self.converter = XmlToPythonConverter()
     
     @classmethod
-    def read_file(cls, file_path):
+    def read_file(cls, file_path, use_cache=False):
         """
         Read a drawio file and convert it to a drawpyo File object.
         
@@ -84,12 +101,23 @@ class DrawioReader:
         and converts it to a drawpyo File object that can be manipulated
         programmatically.
         
-        This class method creates a temporary DrawioReader instance, uses it
-        to read the file, and then discards it. This is convenient for one-off
-        operations.
+        This class method uses a DrawioReader instance that is created on
+        first use and shared by later calls, so reading many files doesn't
+        rebuild the parser and converter each time.
+        
+        With use_cache=True, the parsed contents of the file are kept so
+        reading it again only repeats the conversion. Up to 32 parsed files
+        stay in memory, for the life of the process, until they're pushed
+        out by newer ones or clear_cache is called. A file counts as
+        unchanged while its modification time and size are the same, so a
+        file rewritten at the same size within the filesystem's timestamp
+        resolution can come back stale; only cache files that aren't being
+        rewritten, or call clear_cache after writing them.
         
         Args:
             file_path (str): Path to the drawio file
+            use_cache (bool): Reuse (and keep) the parsed contents of the
+                file across calls. Default is False.
             
         Returns:
             File: A drawpyo File object containing the converted diagrams
@@ -112,10 +140,49 @@ class DrawioReader:
             except ValueError as e:
                 print(f"Error reading file: {e}")
         """
-        reader = cls()
-        parsed_data = reader.parser.parse_file(file_path)
+        reader = cls._shared_reader()
+        if not use_cache:
+            parsed_data = reader.parser.parse_file(file_path)
+            return reader.converter.convert_file(parsed_data)
+        
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            raise ValueError(f"Failed to parse drawio file: {str(e)}") from e
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        
+        with _FILE_CACHE_LOCK:
+            parsed_data = _FILE_CACHE.get(key)
+            if parsed_data is not None:
+                _FILE_CACHE.move_to_end(key)
+        
+        if parsed_data is None:
+            parsed_data = reader.parser.parse_file(file_path)
+            with _FILE_CACHE_LOCK:
+                _FILE_CACHE[key] = parsed_data
+                if len(_FILE_CACHE) > _FILE_CACHE_SIZE:
+                    _FILE_CACHE.popitem(last=False)
+        
         return reader.converter.convert_file(parsed_data)
     
+    @classmethod
+    def clear_cache(cls):
+        """
+        Forget the files remembered by read_file.
+        
+        read_file(..., use_cache=True) keeps the parsed contents of recently
+        read files and reuses them while a file's modification time and size
+        are unchanged.
+        Clearing the cache forces the next read of every file to go back to
+        disk.
+        
+        Example:
+            file = DrawioReader.read_file("example.drawio")
+            DrawioReader.clear_cache()
+        """
+        with _FILE_CACHE_LOCK:
+            _FILE_CACHE.clear()
+    
     @classmethod
     def read_xml_string(cls, xml_string):
         """
@@ -155,10 +222,30 @@ class DrawioReader:
             except ValueError as e:
                 print(f"Error parsing XML: {e}")
         """
-        reader = cls()
+        reader = cls._shared_reader()
         parsed_data = reader.parser.parse_xml_string(xml_string)
         return reader.converter.convert_file(parsed_data)
     
+    @classmethod
+    def _shared_reader(cls):
+        """
+        Get the reader instance shared by the class methods.
+        
+        The instance is created on first use in each thread and reused by
+        later calls in that thread. Each subclass gets its own, so a subclass
+        overriding __init__ is still constructed its own way.
+        
+        Returns:
+            DrawioReader: The calling thread's shared instance of cls
+        """
+        readers = getattr(_SHARED_READERS, 'readers', None)
+        if readers is None:
+            readers = _SHARED_READERS.readers = {}
+        reader = readers.get(cls)
+        if reader is None:
+            reader = readers[cls] = cls()
+        return reader
+    
     def parse_and_convert(self, file_path):
         """
         Parse a drawio file and convert it to a drawpyo File object.
@@ -28,6 +28,202 @@ Technical details:
 - Boolean values ("true"/"false") are converted to Python booleans
 """
 
+import re
+import sys
+from functools import lru_cache
+
+# Style values converted to Python types: group 1 matches integers, group 2
+# floats and groups 3 and 4 the booleans true and false in any case
+_VALUE_PATTERN = re.compile(
+    r'(\d+)|(\d+\.\d*|\.\d+)|((?i:true))|((?i:false))', re.ASCII
+)
+
+# Drawio keys whose values are always names or colors, never numbers or
+# booleans, so their values are kept as strings without being classified
+_STRING_KEYS = frozenset((
+    'align',
+    'direction',
+    'edgeStyle',
+    'elbow',
+    'endArrow',
+    'fillColor',
+    'fillStyle',
+    'fontColor',
+    'fontFamily',
+    'gradientColor',
+    'gradientDirection',
+    'image',
+    'jumpStyle',
+    'labelBackgroundColor',
+    'labelBorderColor',
+    'labelPosition',
+    'perimeter',
+    'shape',
+    'startArrow',
+    'strokeColor',
+    'swimlaneFillColor',
+    'verticalAlign',
+    'verticalLabelPosition',
+    'whiteSpace',
+))
+
+# Parsed styles keyed by their contents, so style strings that differ only
+# in form (a trailing semicolon, empty segments) share one result. Styles
+# with the same keys in the same order also share one tuple of keys
+_STYLE_INTERN = {}
+_KEY_TUPLES = {}
+_STYLE_INTERN_SIZE = 4096
+
+
+class _FrozenStyle:
+    """
+    A parsed style string, stored as parallel tuples of keys and values.
+    
+    Styles hold a few dozen keys at most, so a linear scan of a tuple finds
+    a key about as fast as a dict lookup while taking much less memory.
+    Instances are shared between callers and must not be modified.
+    """
+    
+    __slots__ = ('keys', 'values')
+    
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+    
+    def get(self, key, default=None):
+        """
+        Get the value for a key.
+        
+        Args:
+            key (str): The key to look for
+            default: The value to return if the key is not set
+            
+        Returns:
+            The value for the key, or the default if not found
+        """
+        try:
+            return self.values[self.keys.index(key)]
+        except ValueError:
+            return default
+    
+    def items(self):
+        """
+        Iterate over the (key, value) pairs in style string order.
+        
+        Returns:
+            iterator: The style attributes and values
+        """
+        return zip(self.keys, self.values)
+
+
+def _convert_value(value):
+    """
+    Convert a raw style value to an int, float or bool where it looks like one.
+    
+    Args:
+        value (str): The raw value from the style string
+        
+    Returns:
+        The converted value, or the original string
+    """
+    # The group of the value pattern that matched tells the type
+    match = _VALUE_PATTERN.fullmatch(value)
+    if match is None:
+        return value
+    kind = match.lastindex
+    if kind == 1:
+        # Integer value
+        return int(value)
+    if kind == 2:
+        # Float value
+        return float(value)
+    # Boolean value
+    return kind == 3
+
+
+@lru_cache(maxsize=4096)
+def _parse_style(style_str):
+    """
+    Parse a non-empty style string into a read-only style.
+    
+    Drawio files reuse a small set of style strings across many cells, so
+    results are cached. Equal results are also interned, so strings written
+    differently but meaning the same thing share a single style. The style
+    is shared between callers and therefore read-only;
+    StyleParser.parse_style returns a mutable dict copy of it.
+    
+    Args:
+        style_str (str): The style string to parse
+        
+    Returns:
+        _FrozenStyle: The style attributes and values
+    """
+    style_dict = {}
+    # Drawio writes a trailing semicolon, which would otherwise leave an
+    # empty part at the end
+    parts = style_str.rstrip(';').split(';')
+    
+    # First part might be a base style without an equals sign
+    first = parts[0]
+    if first and '=' not in first:
+        style_dict['baseStyle'] = first
+        parts = parts[1:]
+    
+    for part in parts:
+        # Parts without an equals sign, including empty parts, are skipped
+        key, sep, value = part.partition('=')
+        if not sep:
+            continue
+        # Interned keys are shared by every cached style and compare by
+        # identity against the literal keys callers look up
+        key = sys.intern(key)
+        if key in _STRING_KEYS:
+            style_dict[key] = value
+        else:
+            style_dict[key] = _convert_value(value)
+    
+    keys = tuple(style_dict)
+    values = tuple(style_dict.values())
+    # The value types are part of the key since 1, 1.0 and True compare equal
+    intern_key = (keys, values, tuple(map(type, values)))
+    style = _STYLE_INTERN.get(intern_key)
+    if style is None:
+        if len(_STYLE_INTERN) >= _STYLE_INTERN_SIZE:
+            _STYLE_INTERN.clear()
+            _KEY_TUPLES.clear()
+        keys = _KEY_TUPLES.setdefault(keys, keys)
+        style = _STYLE_INTERN[intern_key] = _FrozenStyle(keys, values)
+    return style
+
+
+def _find_key_span(style_str, key, start=0):
+    """
+    Find a key=value segment of a style string.
+    
+    Args:
+        style_str (str): The style string to search
+        key (str): The key to look for
+        start (int): Where to start searching
+        
+    Returns:
+        tuple: The (start, end) indexes of the first segment for the key at
+            or after start, with end pointing at its closing semicolon (or
+            the end of the string), or None if the key isn't set
+    """
+    needle = key + '='
+    if style_str.startswith(needle, start) and (start == 0 or style_str[start - 1] == ';'):
+        segment_start = start
+    else:
+        segment_start = style_str.find(';' + needle, start)
+        if segment_start == -1:
+            return None
+        segment_start += 1
+    
+    segment_end = style_str.find(';', segment_start)
+    if segment_end == -1:
+        segment_end = len(style_str)
+    return segment_start, segment_end
+
 
 class StyleParser:
     """
@@ -92,35 +288,9 @@ class StyleParser:
         if not style_str:
             return {}
         
-        style_dict = {}
-        parts = style_str.split(';')
-        
-        for i, part in enumerate(parts):
-            if not part:
-                continue
-                
-            # First part might be a base style without an equals sign
-            if i == 0 and '=' not in part:
-                style_dict['baseStyle'] = part
-            elif '=' in part:
-                key, value = part.split('=', 1)
-                
-                # Convert numeric values
-                if value.isdigit():
-                    # Integer value
-                    value = int(value)
-                elif value.replace('.', '', 1).isdigit() and value.count('.') == 1:
-                    # Float value
-                    value = float(value)
-                # Convert boolean values
-                elif value.lower() == 'true':
-                    value = True
-                elif value.lower() == 'false':
-                    value = False
-                    
-                style_dict[key] = value
-        
-        return style_dict
+        # The cached result is shared, so hand out a copy the caller can
+        # modify freely
+        return dict(_parse_style(style_str).items())
     
     @staticmethod
     def create_style(style_dict):
@@ -159,17 +329,18 @@ class StyleParser:
         if not style_dict:
             return ""
             
-        style_parts = []
+        # Format all key=value pairs in one comprehension
+        style_parts = [
+            f"{key}={value}"
+            for key, value in style_dict.items()
+            if value is not None and key != 'baseStyle'
+        ]
+        
+        # Handle base style first, skipping it like any other None value
+        base_style = style_dict.get('baseStyle')
+        if base_style is not None:
+            style_parts.insert(0, str(base_style))
         
-        # Handle base style first
-        if 'baseStyle' in style_dict:
-            style_parts.append(str(style_dict['baseStyle']))
-            
-        # Add all other key=value pairs
-        for key, value in style_dict.items():
-            if key != 'baseStyle' and value is not None:
-                style_parts.append(f"{key}={value}")
-                
         return ';'.join(style_parts)
     
     @staticmethod
@@ -177,8 +348,8 @@ class StyleParser:
         """
         Get a specific value from a style string.
         
-        This method parses a style string and extracts the value for a
-        specific key. If the key is not found, it returns the default value.
+        This method scans a style string for a specific key and extracts
+        its value without parsing the rest of the string. If the key is not found, it returns the default value.
         
         Args:
             style_str (str): The style string to parse
@@ -199,8 +370,29 @@ class StyleParser:
             width = StyleParser.get_style_value(style_str, 'strokeWidth', 1)
             print(width)  # 1 (default value)
         """
-        style_dict = StyleParser.parse_style(style_str)
-        return style_dict.get(key, default)
+        if not style_str:
+            return default
+        if key == 'baseStyle':
+            # The base style can only be the first part
+            base_style = style_str.partition(';')[0]
+            if not base_style or '=' in base_style:
+                return default
+            return base_style
+        
+        # Scan the string for the key rather than parsing all of it. Later
+        # segments win when a key is repeated, as they do in parse_style
+        span = _find_key_span(style_str, key)
+        if span is None:
+            return default
+        next_span = _find_key_span(style_str, key, span[1])
+        while next_span is not None:
+            span = next_span
+            next_span = _find_key_span(style_str, key, span[1])
+        start, end = span
+        value = style_str[start + len(key) + 1:end]
+        if key in _STRING_KEYS:
+            return value
+        return _convert_value(value)
     
     @staticmethod
     def set_style_value(style_str, key, value):
@@ -230,9 +422,25 @@ class StyleParser:
             updated_style = StyleParser.set_style_value(style_str, 'dashed', True)
             print(updated_style)  # "shape=rectangle;fillColor=#f5f5f5;strokeColor=#666666;dashed=true"
         """
-        style_dict = StyleParser.parse_style(style_str)
-        style_dict[key] = value
-        return StyleParser.create_style(style_dict)
+        span = _find_key_span(style_str, key) if style_str else None
+        repeated = span is not None and _find_key_span(style_str, key, span[1]) is not None
+        text = str(value)
+        if key == 'baseStyle' or value is None or ';' in text or '=' in text or repeated:
+            # Cases that need the full parse: the base style is positional,
+            # None removes the key, separators in the value and repeated
+            # keys need the normalized form
+            style_dict = StyleParser.parse_style(style_str)
+            style_dict[key] = value
+            return StyleParser.create_style(style_dict)
+        
+        # Splice the new value into the string directly
+        if span is None:
+            style_str = style_str.rstrip(';') if style_str else ''
+            if not style_str:
+                return f"{key}={text}"
+            return f"{style_str};{key}={text}"
+        start, end = span
+        return f"{style_str[:start]}{key}={text}{style_str[end:]}".rstrip(';')
     
     @staticmethod
     def remove_style_value(style_str, key):
@@ -260,7 +468,18 @@ class StyleParser:
             updated_style = StyleParser.remove_style_value(style_str, 'dashed')
             print(updated_style)  # "shape=rectangle;fillColor=#f5f5f5;strokeColor=#666666"
         """
-        style_dict = StyleParser.parse_style(style_str)
-        if key in style_dict:
-            del style_dict[key]
-        return StyleParser.create_style(style_dict)
+        if not style_str:
+            return ""
+        if key == 'baseStyle':
+            # The base style is positional, so it needs the full parse
+            style_dict = StyleParser.parse_style(style_str)
+            style_dict.pop(key, None)
+            return StyleParser.create_style(style_dict)
+        
+        # Cut every key=value segment for the key out of the string
+        span = _find_key_span(style_str, key)
+        while span is not None:
+            start, end = span
+            style_str = style_str[:start] + style_str[end + 1:]
+            span = _find_key_span(style_str, key, start)
+        return style_str.rstrip(';')
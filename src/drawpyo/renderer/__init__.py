@@ -17,11 +17,246 @@ also visualize the results.
 """
 
 import os
-import math
-import xml.etree.ElementTree as ET
+from functools import lru_cache
+from xml.sax.saxutils import escape
 from ..diagram.objects import Object
 from ..diagram.edges import Edge
-from .style_parser import StyleParser
+from ..reader.style_parser import StyleParser
+from ..utils import atomic_write
+
+# Characters escaped in attribute values on top of &, < and >, matching what
+# ElementTree writes
+_ATTR_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+def _attr(value):
+    """
+    Escape a value for use inside a double-quoted SVG attribute.
+    
+    Args:
+        value: The attribute value, converted with str()
+        
+    Returns:
+        str: The escaped value
+    """
+    return escape(str(value), _ATTR_ENTITIES)
+
+
+@lru_cache(maxsize=8192)
+def _fmt(value):
+    """
+    Format a coordinate or size for SVG output, caching the result.
+    
+    Whole numbers are written without a decimal point. Diagrams reuse the
+    same handful of grid-aligned values, so most calls are cache hits, which
+    are much cheaper than converting a float to a string.
+    
+    Args:
+        value (int or float): The number to format
+        
+    Returns:
+        str: The formatted number
+    """
+    if value % 1 == 0:
+        return str(int(value))
+    return str(value)
+
+
+# Values used for style attributes a shape or edge doesn't set
+_STYLE_DEFAULTS = {
+    "shape": "rectangle",
+    "rounded": 0,
+    "fillColor": "#ffffff",
+    "strokeColor": "#000000",
+    "strokeWidth": "1",
+    "dashed": 0,
+    "edgeStyle": "orthogonalEdgeStyle",
+    "startArrow": "none",
+    "endArrow": "classic",
+    "fontFamily": "Arial",
+    "fontSize": "12",
+    "fontColor": "#000000",
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse_style_cached(style_str):
+    """
+    Parse a style string for rendering, caching the result.
+    
+    Most shapes on a page share a handful of style strings, so each distinct
+    string is only parsed once. The renderer's defaults are merged in at the
+    same time, so every attribute it draws with can be read directly. The
+    returned dictionary is shared between callers and must not be modified.
+    
+    Args:
+        style_str (str): The style string to parse
+        
+    Returns:
+        dict: A dictionary of style attributes and values
+    """
+    return {**_STYLE_DEFAULTS, **StyleParser.parse_style(style_str)}
+
+
+@lru_cache(maxsize=4096)
+def _style_fragments(style_str):
+    """
+    Parse a style string and format the SVG attributes it renders with.
+    
+    The paint and font attributes only depend on the style, so they're
+    formatted once per distinct style string. Rendering a shape that shares
+    its style with others then only has to fill in its coordinates.
+    
+    Args:
+        style_str (str): The style string to parse
+        
+    Returns:
+        tuple: The style dictionary, the fill and stroke attributes, and the
+            font attributes
+    """
+    style_dict = _parse_style_cached(style_str)
+    paint = (
+        f'fill="{_attr(style_dict["fillColor"])}" '
+        f'stroke="{_attr(style_dict["strokeColor"])}" '
+        f'stroke-width="{_attr(style_dict["strokeWidth"])}"'
+    )
+    font = (
+        f'font-family="{_attr(style_dict["fontFamily"])}" '
+        f'font-size="{_attr(style_dict["fontSize"])}" '
+        f'fill="{_attr(style_dict["fontColor"])}"'
+    )
+    return style_dict, paint, font
+
+
+
+# The shape drawn inside each type of arrow marker, filled and stroked in
+# the edge's color
+_ARROW_SHAPES = {
+    # Classic arrow (triangle)
+    "classic": '<path d="M 0 0 L 10 5 L 0 10 z" fill="{color}" stroke="{color}" />',
+    # Block arrow (rectangle)
+    "block": '<path d="M 0 0 L 10 0 L 10 10 L 0 10 z" fill="{color}" stroke="{color}" />',
+    # Open arrow (V shape)
+    "open": '<path d="M 0 0 L 10 5 L 0 10" fill="none" stroke="{color}" />',
+    # Oval arrow (circle)
+    "oval": '<circle cx="5" cy="5" r="5" fill="{color}" stroke="{color}" />',
+    # Diamond arrow
+    "diamond": '<path d="M 0 5 L 5 0 L 10 5 L 5 10 z" fill="{color}" stroke="{color}" />',
+}
+
+# The complete marker element for each type of arrow, built once so only the
+# marker's ID and color are left to fill in
+_ARROW_MARKERS = {
+    arrow_type: (
+        '<marker id="{marker_id}" viewBox="0 0 10 10" refX="10" refY="5" '
+        f'markerWidth="6" markerHeight="6" orient="auto">{shape}</marker>'
+    )
+    for arrow_type, shape in _ARROW_SHAPES.items()
+}
+
+
+@lru_cache(maxsize=256)
+def _arrow_marker_svg(marker_id, arrow_type, stroke_color):
+    """
+    Format the SVG marker element for an arrow head.
+    
+    Pages use only a few arrow types and colors, and the markers are
+    numbered in order of first use, so the same markers come up render
+    after render and are only formatted once.
+    
+    Args:
+        marker_id (str): The ID to use for the marker
+        arrow_type (str): The type of arrow (classic, block, open, etc.)
+        stroke_color (str): The color of the arrow
+        
+    Returns:
+        str: The marker element
+    """
+    # Look up the arrow's marker, defaulting to the classic arrow
+    template = _ARROW_MARKERS.get(arrow_type, _ARROW_MARKERS["classic"])
+    return template.format(marker_id=_attr(marker_id), color=_attr(stroke_color))
+
+
+# The HTML document a page's SVG is embedded in, with the page title filled
+# into the head
+_HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <style>
+        body {{ margin: 0; padding: 0; overflow: hidden; }}
+        #diagram-container {{ width: 100%; height: 100vh; }}
+    </style>
+</head>
+<body>
+    <div id="diagram-container">
+        """
+
+# Script adding zooming and panning to the HTML document
+_HTML_SCRIPT = """
+    <script>
+        // Add zooming and panning functionality
+        (function() {
+            const svg = document.querySelector('svg');
+            let isPanning = false;
+            let startPoint = { x: 0, y: 0 };
+            let currentTranslate = { x: 0, y: 0 };
+            let scale = 1;
+            
+            // Add event listeners for zooming
+            svg.addEventListener('wheel', function(event) {
+                event.preventDefault();
+                const delta = event.deltaY;
+                const scaleAmount = delta > 0 ? 0.9 : 1.1;
+                scale *= scaleAmount;
+                
+                // Apply the scale transform
+                const g = svg.querySelector('g');
+                g.setAttribute('transform', 
+                    `translate(${currentTranslate.x},${currentTranslate.y}) scale(${scale})`);
+            });
+            
+            // Add event listeners for panning
+            svg.addEventListener('mousedown', function(event) {
+                if (event.button === 0) {  // Left mouse button
+                    isPanning = true;
+                    startPoint = { x: event.clientX, y: event.clientY };
+                }
+            });
+            
+            svg.addEventListener('mousemove', function(event) {
+                if (isPanning) {
+                    const dx = event.clientX - startPoint.x;
+                    const dy = event.clientY - startPoint.y;
+                    
+                    currentTranslate.x += dx;
+                    currentTranslate.y += dy;
+                    
+                    startPoint = { x: event.clientX, y: event.clientY };
+                    
+                    // Apply the transform
+                    const g = svg.querySelector('g');
+                    g.setAttribute('transform', 
+                        `translate(${currentTranslate.x},${currentTranslate.y}) scale(${scale})`);
+                }
+            });
+            
+            svg.addEventListener('mouseup', function() {
+                isPanning = false;
+            });
+            
+            svg.addEventListener('mouseleave', function() {
+                isPanning = false;
+            });
+        })();
+    </script>
+"""
+
+_HTML_TAIL = """
+</body>
+</html>
+"""
 
 
 class DiagramRenderer:
@@ -62,8 +297,17 @@ class DiagramRenderer:
         self.show_grid = False  # Whether to show the grid
         self.grid_size = 10  # Grid size in pixels
         self.grid_color = "#d0d0d0"  # Grid color
+        
+        # Shape renderers by shape type, anything else is drawn as a rectangle
+        self._shape_renderers = {
+            "ellipse": self._render_ellipse,
+            "rhombus": self._render_rhombus,
+            "triangle": self._render_triangle,
+            "hexagon": self._render_hexagon,
+            "cylinder": self._render_cylinder,
+        }
     
-    def render_page_to_svg(self, page):
+    def render_page_to_svg(self, page, viewport=None):
         """
         Render a drawpyo Page to SVG format.
         
@@ -72,6 +316,9 @@ class DiagramRenderer:
         
         Args:
             page (Page): The drawpyo Page object to render
+            viewport (tuple, optional): A (x0, y0, x1, y1) box in diagram
+                coordinates to crop the SVG to. Objects and edges entirely
+                outside it aren't rendered. Defaults to the whole page.
             
         Returns:
             str: The SVG content as a string
@@ -91,47 +338,111 @@ class DiagramRenderer:
             with open("diagram.svg", "w") as f:
                 f.write(svg_content)
         """
-        # Calculate the bounds of the diagram
-        bounds = self._calculate_page_bounds(page)
+        # The SVG is written out as text fragments, which are joined once
+        # at the end
+        parts = []
+        self._write_svg(page, parts.append, viewport)
+        return "".join(parts)
+    
+    def _write_svg(self, page, write, viewport=None):
+        """
+        Write a drawpyo Page out as SVG.
+        
+        The SVG is produced as a sequence of text fragments, each passed to
+        write as soon as it's ready, so it can be collected in memory or
+        streamed straight to a file.
+        
+        Args:
+            page (Page): The drawpyo Page object to render
+            write (callable): Called with each SVG text fragment in order
+            viewport (tuple, optional): A (x0, y0, x1, y1) box in diagram
+                coordinates to crop the SVG to
+        """
+        # Split the page into objects and edges in a single pass
+        objects = []
+        edges = []
+        for obj in page.objects:
+            if isinstance(obj, Object):
+                objects.append(obj)
+            elif isinstance(obj, Edge):
+                edges.append(obj)
+        
+        if viewport is None:
+            # Calculate the bounds of the diagram
+            bounds = self._calculate_page_bounds(objects)
+        else:
+            # Crop to the viewport, culling everything that's outside it
+            min_x, min_y, max_x, max_y = viewport
+            bounds = {
+                "min_x": min_x,
+                "min_y": min_y,
+                "max_x": max_x,
+                "max_y": max_y,
+                "width": max_x - min_x,
+                "height": max_y - min_y
+            }
+            objects = [
+                obj for obj in objects if self._object_in_viewport(obj, viewport)
+            ]
+            edges = [
+                edge for edge in edges if self._edge_in_viewport(edge, viewport)
+            ]
+        
         width = bounds["width"] + 2 * self.padding
         height = bounds["height"] + 2 * self.padding
         
-        # Create the SVG root element
-        svg = ET.Element("svg", {
-            "xmlns": "http://www.w3.org/2000/svg",
-            "width": str(width),
-            "height": str(height),
-            "viewBox": f"0 0 {width} {height}"
-        })
+        # Offset that moves the top-left corner of the diagram to the
+        # padding, added to every coordinate as it's written
+        dx = self.padding - bounds["min_x"]
+        dy = self.padding - bounds["min_y"]
+        
+        # Open the SVG root element
+        write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{_fmt(width)}" height="{_fmt(height)}" '
+            f'viewBox="0 0 {_fmt(width)} {_fmt(height)}">'
+        )
         
         # Add a background rectangle
-        ET.SubElement(svg, "rect", {
-            "width": "100%",
-            "height": "100%",
-            "fill": self.background_color
-        })
+        write(
+            f'<rect width="100%" height="100%" '
+            f'fill="{_attr(self.background_color)}" />'
+        )
         
-        # Add a group for the diagram content with a transform to apply padding
-        g = ET.SubElement(svg, "g", {
-            "transform": f"translate({self.padding},{self.padding})"
-        })
+        # Open a group for the diagram content, which the interactive
+        # HTML view transforms to zoom and pan
+        write("<g>")
         
         # Draw grid if enabled
         if self.show_grid:
-            self._draw_grid(g, bounds)
-        
-        # Draw all objects
-        for obj in page.objects:
-            if isinstance(obj, Object):
-                self._render_object_to_svg(obj, g)
+            self._draw_grid(write, bounds, dx, dy)
         
-        # Draw all edges (after objects so they appear on top)
-        for obj in page.objects:
-            if isinstance(obj, Edge):
-                self._render_edge_to_svg(obj, g)
+        # The rectangle of each object in SVG coordinates, worked out the
+        # first time it's needed and shared with the edges connected to it
+        rects = {}
         
-        # Convert the XML to a string
-        return ET.tostring(svg, encoding="unicode")
+        # Draw all objects
+        for obj in objects:
+            self._render_object_to_svg(obj, write, rects, dx, dy)
+        
+        # Draw all edges (after objects so they appear on top). The arrow
+        # markers they use are collected so each is only defined once
+        markers = {}
+        for edge in edges:
+            self._render_edge_to_svg(edge, write, markers, rects, dx, dy)
+        
+        # Close the content group
+        write("</g>")
+        
+        # Define the arrow markers at the top level of the SVG
+        if markers:
+            write("<defs>")
+            for (arrow_type, stroke_color), marker_id in markers.items():
+                self._add_arrow_marker(write, marker_id, arrow_type, stroke_color)
+            write("</defs>")
+        
+        # Close the root element
+        write("</svg>")
     
     def render_page_to_html(self, page, include_interactivity=True):
         """
@@ -163,93 +474,33 @@ class DiagramRenderer:
             with open("diagram.html", "w") as f:
                 f.write(html_content)
         """
-        # Get the SVG content
-        svg_content = self.render_page_to_svg(page)
+        # The HTML is written out as text fragments, which are joined once
+        # at the end
+        parts = []
+        self._write_html(page, parts.append, include_interactivity)
+        return "".join(parts)
+    
+    def _write_html(self, page, write, include_interactivity=True):
+        """
+        Write a drawpyo Page out as an HTML document.
         
-        # Create the HTML document
-        html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>{page.name}</title>
-    <style>
-        body {{ margin: 0; padding: 0; overflow: hidden; }}
-        #diagram-container {{ width: 100%; height: 100vh; }}
-    </style>
-</head>
-<body>
-    <div id="diagram-container">
-        {svg_content}
-    </div>
-"""
+        Like _write_svg, each text fragment is passed to write as soon as
+        it's ready, with the SVG written straight into the document.
+        
+        Args:
+            page (Page): The drawpyo Page object to render
+            write (callable): Called with each HTML text fragment in order
+            include_interactivity (bool): Whether to include interactive features
+        """
+        write(_HTML_HEAD.format(title=escape(str(page.name))))
+        self._write_svg(page, write)
+        write("\n    </div>\n")
         
         # Add interactive features if requested
         if include_interactivity:
-            html += """
-    <script>
-        // Add zooming and panning functionality
-        (function() {
-            const svg = document.querySelector('svg');
-            let isPanning = false;
-            let startPoint = { x: 0, y: 0 };
-            let currentTranslate = { x: 0, y: 0 };
-            let scale = 1;
-            
-            // Add event listeners for zooming
-            svg.addEventListener('wheel', function(event) {
-                event.preventDefault();
-                const delta = event.deltaY;
-                const scaleAmount = delta > 0 ? 0.9 : 1.1;
-                scale *= scaleAmount;
-                
-                // Apply the scale transform
-                const g = svg.querySelector('g');
-                g.setAttribute('transform', 
-                    `translate(${currentTranslate.x},${currentTranslate.y}) scale(${scale})`);
-            });
-            
-            // Add event listeners for panning
-            svg.addEventListener('mousedown', function(event) {
-                if (event.button === 0) {  // Left mouse button
-                    isPanning = true;
-                    startPoint = { x: event.clientX, y: event.clientY };
-                }
-            });
-            
-            svg.addEventListener('mousemove', function(event) {
-                if (isPanning) {
-                    const dx = event.clientX - startPoint.x;
-                    const dy = event.clientY - startPoint.y;
-                    
-                    currentTranslate.x += dx;
-                    currentTranslate.y += dy;
-                    
-                    startPoint = { x: event.clientX, y: event.clientY };
-                    
-                    // Apply the transform
-                    const g = svg.querySelector('g');
-                    g.setAttribute('transform', 
-                        `translate(${currentTranslate.x},${currentTranslate.y}) scale(${scale})`);
-                }
-            });
-            
-            svg.addEventListener('mouseup', function() {
-                isPanning = false;
-            });
-            
-            svg.addEventListener('mouseleave', function() {
-                isPanning = false;
-            });
-        })();
-    </script>
-"""
-        
-        html += """
-</body>
-</html>
-"""
+            write(_HTML_SCRIPT)
         
-        return html
+        write(_HTML_TAIL)
     
     def save_page_as_svg(self, page, file_path):
         """
@@ -281,10 +532,10 @@ class DiagramRenderer:
                 print(f"Failed to save SVG")
         """
         try:
-            svg_content = self.render_page_to_svg(page)
-            
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(svg_content)
+            # Stream the SVG into the file rather than building it in memory.
+            # An existing file is only replaced once the render completes
+            with atomic_write(file_path) as f:
+                self._write_svg(page, f.write)
                 
             return True
         except Exception as e:
@@ -323,17 +574,40 @@ class DiagramRenderer:
                 print(f"Failed to save HTML")
         """
         try:
-            html_content = self.render_page_to_html(page, include_interactivity)
-            
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
+            # Stream the HTML into the file rather than building it in memory.
+            # An existing file is only replaced once the render completes
+            with atomic_write(file_path) as f:
+                self._write_html(page, f.write, include_interactivity)
                 
             return True
         except Exception as e:
             print(f"Error saving HTML: {str(e)}")
             return False
     
-    def _calculate_page_bounds(self, page):
+    @classmethod
+    def clear_cache(cls):
+        """
+        Forget the styles, paths and markers remembered between renders.
+        
+        Parsed styles, edge paths and arrow markers are cached by their
+        inputs, so the caches never go stale, but they're kept for the life
+        of the process. Clearing them frees that memory, for instance after
+        rendering a very large diagram.
+        
+        Example:
+            renderer = DiagramRenderer()
+            renderer.save_page_as_svg(page, "diagram.svg")
+            DiagramRenderer.clear_cache()
+        """
+        _fmt.cache_clear()
+        _parse_style_cached.cache_clear()
+        _style_fragments.cache_clear()
+        _arrow_marker_svg.cache_clear()
+        cls._calculate_straight_path.cache_clear()
+        cls._calculate_orthogonal_path.cache_clear()
+        cls._calculate_elbow_path.cache_clear()
+    
+    def _calculate_page_bounds(self, objects):
         """
         Calculate the bounds of a page.
         
@@ -341,7 +615,7 @@ class DiagramRenderer:
         in a page, which is used to determine the size of the output SVG.
         
         Args:
-            page (Page): The drawpyo Page object
+            objects (list): The drawpyo Objects on the page
             
         Returns:
             dict: A dictionary with the bounds information:
@@ -354,25 +628,26 @@ class DiagramRenderer:
                     "height": float
                 }
         """
-        min_x = float('inf')
-        min_y = float('inf')
-        max_x = float('-inf')
-        max_y = float('-inf')
-        
-        # Check all objects
-        for obj in page.objects:
-            if isinstance(obj, Object):
-                x, y = obj.position
-                width = obj.width
-                height = obj.height
-                
-                min_x = min(min_x, x)
-                min_y = min(min_y, y)
-                max_x = max(max_x, x + width)
-                max_y = max(max_y, y + height)
-        
-        # If there are no objects, use default bounds
-        if min_x == float('inf'):
+        # Collect the edges of all objects into one list per side, so the
+        # bounds come from a single C-level min or max over each list
+        lefts = []
+        tops = []
+        rights = []
+        bottoms = []
+        for obj in objects:
+            x, y = obj.position
+            lefts.append(x)
+            tops.append(y)
+            rights.append(x + obj.width)
+            bottoms.append(y + obj.height)
+        
+        if lefts:
+            min_x = min(lefts)
+            min_y = min(tops)
+            max_x = max(rights)
+            max_y = max(bottoms)
+        else:
+            # If there are no objects, use default bounds
             min_x = 0
             min_y = 0
             max_x = 100
@@ -387,198 +662,266 @@ class DiagramRenderer:
             "height": max_y - min_y
         }
     
-    def _draw_grid(self, parent_element, bounds):
+    @staticmethod
+    def _object_in_viewport(obj, viewport):
+        """
+        Check whether an object overlaps a viewport.
+        
+        Args:
+            obj (Object): The drawpyo Object to check
+            viewport (tuple): The (x0, y0, x1, y1) viewport
+            
+        Returns:
+            bool: False if the object is entirely outside the viewport
+        """
+        x, y = obj.position
+        x0, y0, x1, y1 = viewport
+        return not (
+            x + obj.width < x0 or x > x1 or y + obj.height < y0 or y > y1
+        )
+    
+    @staticmethod
+    def _edge_in_viewport(edge, viewport):
+        """
+        Check whether an edge might overlap a viewport.
+        
+        Edges are routed within the box spanning their source and target,
+        so an edge is only culled when that whole box is outside the
+        viewport. Edges without a source or target aren't rendered anyway.
+        
+        Args:
+            edge (Edge): The drawpyo Edge to check
+            viewport (tuple): The (x0, y0, x1, y1) viewport
+            
+        Returns:
+            bool: False if the edge is entirely outside the viewport
+        """
+        if not edge.source or not edge.target:
+            return False
+        
+        source_x, source_y = edge.source.position
+        target_x, target_y = edge.target.position
+        x0, y0, x1, y1 = viewport
+        return not (
+            max(source_x + edge.source.width, target_x + edge.target.width) < x0
+            or min(source_x, target_x) > x1
+            or max(source_y + edge.source.height, target_y + edge.target.height) < y0
+            or min(source_y, target_y) > y1
+        )
+    
+    def _draw_grid(self, write, bounds, dx, dy):
         """
         Draw a grid in the background of the diagram.
         
         This method adds grid lines to the SVG to help with visual alignment.
         
         Args:
-            parent_element (Element): The SVG element to add the grid to
+            write (callable): Called with each SVG text fragment of the grid
             bounds (dict): The bounds of the diagram
+            dx, dy: Offset from diagram to SVG coordinates
         """
-        grid_group = ET.SubElement(parent_element, "g", {
-            "class": "grid",
-            "stroke": self.grid_color,
-            "stroke-width": "0.5"
-        })
-        
-        # Calculate grid lines
-        min_x = bounds["min_x"]
-        min_y = bounds["min_y"]
-        max_x = bounds["max_x"]
-        max_y = bounds["max_y"]
-        
-        # Round to nearest grid size
-        min_x = math.floor(min_x / self.grid_size) * self.grid_size
-        min_y = math.floor(min_y / self.grid_size) * self.grid_size
-        max_x = math.ceil(max_x / self.grid_size) * self.grid_size
-        max_y = math.ceil(max_y / self.grid_size) * self.grid_size
-        
-        # Draw vertical grid lines
-        for x in range(min_x, max_x + 1, self.grid_size):
-            ET.SubElement(grid_group, "line", {
-                "x1": str(x),
-                "y1": str(min_y),
-                "x2": str(x),
-                "y2": str(max_y)
-            })
-        
-        # Draw horizontal grid lines
-        for y in range(min_y, max_y + 1, self.grid_size):
-            ET.SubElement(grid_group, "line", {
-                "x1": str(min_x),
-                "y1": str(y),
-                "x2": str(max_x),
-                "y2": str(y)
-            })
-    
-    def _render_object_to_svg(self, obj, parent_element):
+        write(f'<g class="grid" stroke="{_attr(self.grid_color)}" stroke-width="0.5">')
+        
+        # Round the bounds out to the grid with floor division, negating
+        # for the upper bounds to round up
+        grid_size = self.grid_size
+        min_x = int(bounds["min_x"] // grid_size) * grid_size
+        min_y = int(bounds["min_y"] // grid_size) * grid_size
+        max_x = -int(-bounds["max_x"] // grid_size) * grid_size
+        max_y = -int(-bounds["max_y"] // grid_size) * grid_size
+        
+        # Draw every grid line as a segment of a single path: vertical lines
+        # first, then horizontal ones. The lines sit on the diagram's grid
+        # and are then offset into SVG coordinates
+        top = _fmt(min_y + dy)
+        bottom = _fmt(max_y + dy)
+        segments = [
+            f"M{_fmt(x + dx)} {top}V{bottom}"
+            for x in range(min_x, max_x + 1, grid_size)
+        ]
+        left = _fmt(min_x + dx)
+        right = _fmt(max_x + dx)
+        segments.extend(
+            f"M{left} {_fmt(y + dy)}H{right}"
+            for y in range(min_y, max_y + 1, grid_size)
+        )
+        write(f'<path d="{"".join(segments)}" fill="none" />')
+        
+        write("</g>")
+    
+    def _object_rect(self, obj, rects, dx, dy):
+        """
+        Get the rectangle an object occupies in SVG coordinates.
+        
+        An object's position is worked out through all of its parents, so
+        the rectangle is only calculated once per render and then shared by
+        the object and every edge connected to it.
+        
+        Args:
+            obj (Object): The drawpyo Object to locate
+            rects (dict): The rectangles calculated so far, by object ID
+            dx, dy: Offset from diagram to SVG coordinates
+            
+        Returns:
+            tuple: (x, y, width, height) of the object
+        """
+        rect = rects.get(id(obj))
+        if rect is None:
+            x, y = obj.position
+            rect = rects[id(obj)] = (x + dx, y + dy, obj.width, obj.height)
+        return rect
+    
+    def _render_object_to_svg(self, obj, write, rects, dx, dy):
         """
         Render a drawpyo Object to SVG.
         
-        This method converts a drawpyo Object to SVG elements and adds them
-        to the parent SVG element.
+        This method converts a drawpyo Object to SVG elements and appends
+        them to the SVG being written.
         
         Args:
             obj (Object): The drawpyo Object to render
-            parent_element (Element): The SVG element to add the object to
+            write (callable): Called with each SVG text fragment of the object
+            rects (dict): The object rectangles calculated so far, by ID
+            dx, dy: Offset from diagram to SVG coordinates
         """
-        x, y = obj.position
-        width = obj.width
-        height = obj.height
+        x, y, width, height = self._object_rect(obj, rects, dx, dy)
         
-        # Get style properties
-        style = obj.get_style_string()
-        style_dict = StyleParser.parse_style(style)
+        # Get style properties, along with the paint and font attributes
+        # shared by every shape with the same style
+        style_dict, paint, font = _style_fragments(obj.style)
         
         # Get shape type
-        shape_type = style_dict.get("shape", "rectangle")
+        shape_type = style_dict["shape"]
         
-        # Create a group for this object
-        g = ET.SubElement(parent_element, "g", {
-            "class": "object",
-            "data-id": str(id(obj))
-        })
+        # Open a group for this object
+        write(f'<g class="object" data-id="{id(obj)}">')
         
         # Create the shape element based on the shape type
-        if shape_type == "ellipse":
-            shape = ET.SubElement(g, "ellipse", {
-                "cx": str(x + width / 2),
-                "cy": str(y + height / 2),
-                "rx": str(width / 2),
-                "ry": str(height / 2)
-            })
-        elif shape_type == "rhombus":
-            points = f"{x},{y + height/2} {x + width/2},{y} {x + width},{y + height/2} {x + width/2},{y + height}"
-            shape = ET.SubElement(g, "polygon", {
-                "points": points
-            })
-        elif shape_type == "triangle":
-            points = f"{x + width/2},{y} {x + width},{y + height} {x},{y + height}"
-            shape = ET.SubElement(g, "polygon", {
-                "points": points
-            })
-        elif shape_type == "hexagon":
-            w4 = width / 4
-            points = f"{x + w4},{y} {x + width - w4},{y} {x + width},{y + height/2} {x + width - w4},{y + height} {x + w4},{y + height} {x},{y + height/2}"
-            shape = ET.SubElement(g, "polygon", {
-                "points": points
-            })
-        elif shape_type == "cylinder":
-            # Cylinders are complex, use a group with multiple elements
-            cylinder_g = ET.SubElement(g, "g")
-            
-            # Draw the main rectangle
-            ET.SubElement(cylinder_g, "rect", {
-                "x": str(x),
-                "y": str(y + height * 0.1),
-                "width": str(width),
-                "height": str(height * 0.8)
-            })
-            
-            # Draw the top ellipse
-            ET.SubElement(cylinder_g, "ellipse", {
-                "cx": str(x + width / 2),
-                "cy": str(y + height * 0.1),
-                "rx": str(width / 2),
-                "ry": str(height * 0.1)
-            })
-            
-            # Draw the bottom ellipse
-            ET.SubElement(cylinder_g, "ellipse", {
-                "cx": str(x + width / 2),
-                "cy": str(y + height * 0.9),
-                "rx": str(width / 2),
-                "ry": str(height * 0.1)
-            })
-            
-            shape = cylinder_g
-        else:  # Default to rectangle
-            # Check if rounded
-            rounded = style_dict.get("rounded", "0")
-            rx = "5" if rounded == "1" else "0"
-            
-            shape = ET.SubElement(g, "rect", {
-                "x": str(x),
-                "y": str(y),
-                "width": str(width),
-                "height": str(height),
-                "rx": rx
-            })
-        
-        # Apply style attributes
-        fill_color = style_dict.get("fillColor", "#ffffff")
-        stroke_color = style_dict.get("strokeColor", "#000000")
-        stroke_width = style_dict.get("strokeWidth", "1")
-        
-        # If shape is a group, apply styles to all children
-        if isinstance(shape, ET.Element) and shape.tag == "g":
-            for child in shape:
-                child.set("fill", fill_color)
-                child.set("stroke", stroke_color)
-                child.set("stroke-width", str(stroke_width))
-        else:
-            shape.set("fill", fill_color)
-            shape.set("stroke", stroke_color)
-            shape.set("stroke-width", str(stroke_width))
+        render_shape = self._shape_renderers.get(shape_type, self._render_rectangle)
+        render_shape(write, x, y, width, height, style_dict, paint)
         
         # Add text if present
         if obj.value:
-            text = ET.SubElement(g, "text", {
-                "x": str(x + width / 2),
-                "y": str(y + height / 2),
-                "text-anchor": "middle",
-                "dominant-baseline": "middle",
-                "font-family": style_dict.get("fontFamily", "Arial"),
-                "font-size": str(style_dict.get("fontSize", "12")),
-                "fill": style_dict.get("fontColor", "#000000")
-            })
-            text.text = obj.value
-    
-    def _render_edge_to_svg(self, edge, parent_element):
+            write(
+                f'<text x="{_fmt(x + width / 2)}" y="{_fmt(y + height / 2)}" '
+                f'text-anchor="middle" dominant-baseline="middle" {font}>'
+                f'{escape(obj.value)}</text>'
+            )
+        
+        write("</g>")
+    
+    def _render_rectangle(self, write, x, y, width, height, style_dict, paint):
+        """
+        Render a rectangle, the default for shapes without their own renderer.
+        
+        The shape renderers all take the same arguments so they can be looked
+        up by shape type.
+        
+        Args:
+            write (callable): Called with each SVG text fragment of the shape
+            x, y: Top-left coordinates of the shape
+            width, height: Dimensions of the shape
+            style_dict (dict): Style properties of the shape
+            paint (str): The fill and stroke attributes for the shape
+        """
+        # Check if rounded
+        rx = "5" if style_dict["rounded"] == 1 else "0"
+        
+        write(
+            f'<rect x="{_fmt(x)}" y="{_fmt(y)}" '
+            f'width="{_fmt(width)}" height="{_fmt(height)}" rx="{rx}" {paint} />'
+        )
+    
+    def _render_ellipse(self, write, x, y, width, height, style_dict, paint):
+        """Render an ellipse filling the shape's bounds (see _render_rectangle)."""
+        write(
+            f'<ellipse cx="{_fmt(x + width / 2)}" cy="{_fmt(y + height / 2)}" '
+            f'rx="{_fmt(width / 2)}" ry="{_fmt(height / 2)}" {paint} />'
+        )
+    
+    def _render_rhombus(self, write, x, y, width, height, style_dict, paint):
+        """Render a rhombus touching the middle of each side (see _render_rectangle)."""
+        points = (
+            f"{_fmt(x)},{_fmt(y + height/2)} "
+            f"{_fmt(x + width/2)},{_fmt(y)} "
+            f"{_fmt(x + width)},{_fmt(y + height/2)} "
+            f"{_fmt(x + width/2)},{_fmt(y + height)}"
+        )
+        write(f'<polygon points="{points}" {paint} />')
+    
+    def _render_triangle(self, write, x, y, width, height, style_dict, paint):
+        """Render a triangle pointing up (see _render_rectangle)."""
+        points = (
+            f"{_fmt(x + width/2)},{_fmt(y)} "
+            f"{_fmt(x + width)},{_fmt(y + height)} "
+            f"{_fmt(x)},{_fmt(y + height)}"
+        )
+        write(f'<polygon points="{points}" {paint} />')
+    
+    def _render_hexagon(self, write, x, y, width, height, style_dict, paint):
+        """Render a hexagon with flat top and bottom (see _render_rectangle)."""
+        w4 = width / 4
+        points = (
+            f"{_fmt(x + w4)},{_fmt(y)} "
+            f"{_fmt(x + width - w4)},{_fmt(y)} "
+            f"{_fmt(x + width)},{_fmt(y + height/2)} "
+            f"{_fmt(x + width - w4)},{_fmt(y + height)} "
+            f"{_fmt(x + w4)},{_fmt(y + height)} "
+            f"{_fmt(x)},{_fmt(y + height/2)}"
+        )
+        write(f'<polygon points="{points}" {paint} />')
+    
+    def _render_cylinder(self, write, x, y, width, height, style_dict, paint):
+        """Render a cylinder standing upright (see _render_rectangle)."""
+        # Cylinders are complex, use a group with multiple elements
+        write("<g>")
+        
+        # Draw the main rectangle
+        write(
+            f'<rect x="{_fmt(x)}" y="{_fmt(y + height * 0.1)}" '
+            f'width="{_fmt(width)}" height="{_fmt(height * 0.8)}" {paint} />'
+        )
+        
+        # Draw the top ellipse
+        write(
+            f'<ellipse cx="{_fmt(x + width / 2)}" cy="{_fmt(y + height * 0.1)}" '
+            f'rx="{_fmt(width / 2)}" ry="{_fmt(height * 0.1)}" {paint} />'
+        )
+        
+        # Draw the bottom ellipse
+        write(
+            f'<ellipse cx="{_fmt(x + width / 2)}" cy="{_fmt(y + height * 0.9)}" '
+            f'rx="{_fmt(width / 2)}" ry="{_fmt(height * 0.1)}" {paint} />'
+        )
+        
+        write("</g>")
+    
+    def _render_edge_to_svg(self, edge, write, markers, rects, dx, dy):
         """
         Render a drawpyo Edge to SVG.
         
-        This method converts a drawpyo Edge to SVG elements and adds them
-        to the parent SVG element.
+        This method converts a drawpyo Edge to SVG elements and appends
+        them to the SVG being written.
         
         Args:
             edge (Edge): The drawpyo Edge to render
-            parent_element (Element): The SVG element to add the edge to
+            write (callable): Called with each SVG text fragment of the edge
+            markers (dict): The arrow markers used so far, mapping
+                (arrow type, stroke color) to the marker ID
+            rects (dict): The object rectangles calculated so far, by ID
+            dx, dy: Offset from diagram to SVG coordinates
         """
         # Skip edges without source or target
         if not edge.source or not edge.target:
             return
         
         # Get source and target positions
-        source_x, source_y = edge.source.position
-        source_width = edge.source.width
-        source_height = edge.source.height
-        
-        target_x, target_y = edge.target.position
-        target_width = edge.target.width
-        target_height = edge.target.height
+        source_x, source_y, source_width, source_height = self._object_rect(
+            edge.source, rects, dx, dy
+        )
+        target_x, target_y, target_width, target_height = self._object_rect(
+            edge.target, rects, dx, dy
+        )
         
         # Calculate center points
         source_center_x = source_x + source_width / 2
@@ -588,17 +931,13 @@ class DiagramRenderer:
         target_center_y = target_y + target_height / 2
         
         # Get style properties
-        style = edge.get_style_string()
-        style_dict = StyleParser.parse_style(style)
+        style_dict, _, font = _style_fragments(edge.style)
         
         # Get edge style
-        edge_style = style_dict.get("edgeStyle", "orthogonalEdgeStyle")
+        edge_style = style_dict["edgeStyle"]
         
-        # Create a group for this edge
-        g = ET.SubElement(parent_element, "g", {
-            "class": "edge",
-            "data-id": str(id(edge))
-        })
+        # Open a group for this edge
+        write(f'<g class="edge" data-id="{id(edge)}">')
         
         # Calculate path based on edge style
         if edge_style == "orthogonalEdgeStyle":
@@ -620,44 +959,35 @@ class DiagramRenderer:
                 target_x, target_y, target_width, target_height
             )
         else:  # Default to straight line
-            # Calculate intersection points with the shape boundaries
-            start_point = self._calculate_intersection_point(
-                source_center_x, source_center_y,
-                target_center_x, target_center_y,
-                source_x, source_y, source_width, source_height
-            )
-            
-            end_point = self._calculate_intersection_point(
-                target_center_x, target_center_y,
-                source_center_x, source_center_y,
+            path_data = self._calculate_straight_path(
+                source_x, source_y, source_width, source_height,
                 target_x, target_y, target_width, target_height
             )
-            
-            path_data = f"M {start_point[0]},{start_point[1]} L {end_point[0]},{end_point[1]}"
         
         # Create the path element
-        path = ET.SubElement(g, "path", {
-            "d": path_data,
-            "fill": "none",
-            "stroke": style_dict.get("strokeColor", "#000000"),
-            "stroke-width": str(style_dict.get("strokeWidth", "1"))
-        })
+        path = (
+            f'<path d="{path_data}" fill="none" '
+            f'stroke="{_attr(style_dict["strokeColor"])}" '
+            f'stroke-width="{_attr(style_dict["strokeWidth"])}"'
+        )
         
         # Add dashed style if specified
-        if style_dict.get("dashed", "0") == "1":
-            path.set("stroke-dasharray", "5,5")
+        if style_dict["dashed"] == 1:
+            path += ' stroke-dasharray="5,5"'
         
         # Add arrows if specified
-        start_arrow = style_dict.get("startArrow", "none")
-        end_arrow = style_dict.get("endArrow", "classic")
+        start_arrow = style_dict["startArrow"]
+        end_arrow = style_dict["endArrow"]
         
         if start_arrow != "none":
-            self._add_arrow_marker(g, "start-arrow", start_arrow, style_dict)
-            path.set("marker-start", "url(#start-arrow)")
+            marker_id = self._arrow_marker_id(markers, start_arrow, style_dict["strokeColor"])
+            path += f' marker-start="url(#{marker_id})"'
         
         if end_arrow != "none":
-            self._add_arrow_marker(g, "end-arrow", end_arrow, style_dict)
-            path.set("marker-end", "url(#end-arrow)")
+            marker_id = self._arrow_marker_id(markers, end_arrow, style_dict["strokeColor"])
+            path += f' marker-end="url(#{marker_id})"'
+        
+        write(path + " />")
         
         # Add label if present
         if edge.label:
@@ -665,33 +995,27 @@ class DiagramRenderer:
             label_x = (source_center_x + target_center_x) / 2
             label_y = (source_center_y + target_center_y) / 2
             
-            # Add a white background for better readability
-            ET.SubElement(g, "rect", {
-                "x": str(label_x - 20),
-                "y": str(label_y - 10),
-                "width": "40",
-                "height": "20",
-                "fill": "white",
-                "stroke": "none"
-            })
-            
-            text = ET.SubElement(g, "text", {
-                "x": str(label_x),
-                "y": str(label_y),
-                "text-anchor": "middle",
-                "dominant-baseline": "middle",
-                "font-family": style_dict.get("fontFamily", "Arial"),
-                "font-size": str(style_dict.get("fontSize", "12")),
-                "fill": style_dict.get("fontColor", "#000000")
-            })
-            text.text = edge.label
-    
-    def _calculate_orthogonal_path(self, source_x, source_y, source_width, source_height,
-                                  target_x, target_y, target_width, target_height):
+            # Stroke the text in the background color underneath its fill,
+            # which gives a halo that fits the label for better readability
+            write(
+                f'<text x="{_fmt(label_x)}" y="{_fmt(label_y)}" '
+                f'text-anchor="middle" dominant-baseline="middle" {font} '
+                f'stroke="{_attr(self.background_color)}" stroke-width="3" '
+                f'stroke-linejoin="round" paint-order="stroke">'
+                f'{escape(edge.label)}</text>'
+            )
+        
+        write("</g>")
+    
+    @staticmethod
+    def _connection_points(source_x, source_y, source_width, source_height,
+                           target_x, target_y, target_width, target_height):
         """
-        Calculate an orthogonal path between two rectangles.
+        Pick the sides of two rectangles that a bent path connects.
         
-        This method calculates a path with right angles between the source and target.
+        The path leaves the source from the side facing the target and
+        enters the target from the side facing the source, at the middle
+        of each side.
         
         Args:
             source_x, source_y: Top-left coordinates of the source rectangle
@@ -700,7 +1024,8 @@ class DiagramRenderer:
             target_width, target_height: Dimensions of the target rectangle
             
         Returns:
-            str: SVG path data string
+            tuple: (start_x, start_y, end_x, end_y, horizontal), where
+                horizontal is True when left and right sides are connected
         """
         # Calculate center points
         source_center_x = source_x + source_width / 2
@@ -714,44 +1039,27 @@ class DiagramRenderer:
             # Connect horizontally (left/right sides)
             if source_center_x < target_center_x:
                 # Source is to the left of target
-                start_x = source_x + source_width
-                start_y = source_center_y
-                end_x = target_x
-                end_y = target_center_y
-            else:
-                # Source is to the right of target
-                start_x = source_x
-                start_y = source_center_y
-                end_x = target_x + target_width
-                end_y = target_center_y
-        else:
-            # Connect vertically (top/bottom sides)
-            if source_center_y < target_center_y:
-                # Source is above target
-                start_x = source_center_x
-                start_y = source_y + source_height
-                end_x = target_center_x
-                end_y = target_y
-            else:
-                # Source is below target
-                start_x = source_center_x
-                start_y = source_y
-                end_x = target_center_x
-                end_y = target_y + target_height
-        
-        # Calculate the midpoint for the orthogonal path
-        mid_x = (start_x + end_x) / 2
-        mid_y = (start_y + end_y) / 2
-        
-        # Create the path data
-        return f"M {start_x},{start_y} L {mid_x},{start_y} L {mid_x},{end_y} L {end_x},{end_y}"
+                return (source_x + source_width, source_center_y, target_x, target_center_y, True)
+            # Source is to the right of target
+            return (source_x, source_center_y, target_x + target_width, target_center_y, True)
+        
+        # Connect vertically (top/bottom sides)
+        if source_center_y < target_center_y:
+            # Source is above target
+            return (source_center_x, source_y + source_height, target_center_x, target_y, False)
+        # Source is below target
+        return (source_center_x, source_y, target_center_x, target_y + target_height, False)
     
-    def _calculate_elbow_path(self, source_x, source_y, source_width, source_height,
-                             target_x, target_y, target_width, target_height):
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _calculate_straight_path(source_x, source_y, source_width, source_height,
+                                 target_x, target_y, target_width, target_height):
         """
-        Calculate an elbow path between two rectangles.
+        Calculate a straight path between two rectangles.
         
-        This method calculates a path with a single bend between the source and target.
+        The path runs along the line between the centers of the rectangles,
+        from where it leaves the source to where it enters the target.
+        Results are cached, since rendering a page again computes the same paths.
         
         Args:
             source_x, source_y: Top-left coordinates of the source rectangle
@@ -769,44 +1077,86 @@ class DiagramRenderer:
         target_center_x = target_x + target_width / 2
         target_center_y = target_y + target_height / 2
         
-        # Determine which sides to connect based on relative positions
-        if abs(source_center_x - target_center_x) > abs(source_center_y - target_center_y):
-            # Connect horizontally (left/right sides)
-            if source_center_x < target_center_x:
-                # Source is to the left of target
-                start_x = source_x + source_width
-                start_y = source_center_y
-                end_x = target_x
-                end_y = target_center_y
-            else:
-                # Source is to the right of target
-                start_x = source_x
-                start_y = source_center_y
-                end_x = target_x + target_width
-                end_y = target_center_y
-                
+        # Calculate intersection points with the shape boundaries
+        start_x, start_y = DiagramRenderer._calculate_intersection_point(
+            source_center_x, source_center_y,
+            target_center_x, target_center_y,
+            source_x, source_y, source_width, source_height
+        )
+        
+        end_x, end_y = DiagramRenderer._calculate_intersection_point(
+            target_center_x, target_center_y,
+            source_center_x, source_center_y,
+            target_x, target_y, target_width, target_height
+        )
+        
+        return f"M{_fmt(start_x)} {_fmt(start_y)}L{_fmt(end_x)} {_fmt(end_y)}"
+    
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _calculate_orthogonal_path(source_x, source_y, source_width, source_height,
+                                   target_x, target_y, target_width, target_height):
+        """
+        Calculate an orthogonal path between two rectangles.
+        
+        This method calculates a path with right angles between the source and target.
+        Results are cached, since rendering a page again computes the same paths.
+        
+        Args:
+            source_x, source_y: Top-left coordinates of the source rectangle
+            source_width, source_height: Dimensions of the source rectangle
+            target_x, target_y: Top-left coordinates of the target rectangle
+            target_width, target_height: Dimensions of the target rectangle
+            
+        Returns:
+            str: SVG path data string
+        """
+        start_x, start_y, end_x, end_y, _ = DiagramRenderer._connection_points(
+            source_x, source_y, source_width, source_height,
+            target_x, target_y, target_width, target_height
+        )
+        
+        # Run horizontally to the midpoint, then vertically and horizontally
+        # again to the end
+        mid_x = (start_x + end_x) / 2
+        return f"M{_fmt(start_x)} {_fmt(start_y)}H{_fmt(mid_x)}V{_fmt(end_y)}H{_fmt(end_x)}"
+    
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _calculate_elbow_path(source_x, source_y, source_width, source_height,
+                              target_x, target_y, target_width, target_height):
+        """
+        Calculate an elbow path between two rectangles.
+        
+        This method calculates a path with a single bend between the source and target.
+        Results are cached, since rendering a page again computes the same paths.
+        
+        Args:
+            source_x, source_y: Top-left coordinates of the source rectangle
+            source_width, source_height: Dimensions of the source rectangle
+            target_x, target_y: Top-left coordinates of the target rectangle
+            target_width, target_height: Dimensions of the target rectangle
+            
+        Returns:
+            str: SVG path data string
+        """
+        start_x, start_y, end_x, end_y, horizontal = DiagramRenderer._connection_points(
+            source_x, source_y, source_width, source_height,
+            target_x, target_y, target_width, target_height
+        )
+        
+        if horizontal:
             # Create the path data with a horizontal bend
-            return f"M {start_x},{start_y} L {(start_x + end_x) / 2},{start_y} L {(start_x + end_x) / 2},{end_y} L {end_x},{end_y}"
-        else:
-            # Connect vertically (top/bottom sides)
-            if source_center_y < target_center_y:
-                # Source is above target
-                start_x = source_center_x
-                start_y = source_y + source_height
-                end_x = target_center_x
-                end_y = target_y
-            else:
-                # Source is below target
-                start_x = source_center_x
-                start_y = source_y
-                end_x = target_center_x
-                end_y = target_y + target_height
-                
-            # Create the path data with a vertical bend
-            return f"M {start_x},{start_y} L {start_x},{(start_y + end_y) / 2} L {end_x},{(start_y + end_y) / 2} L {end_x},{end_y}"
+            mid_x = (start_x + end_x) / 2
+            return f"M{_fmt(start_x)} {_fmt(start_y)}H{_fmt(mid_x)}V{_fmt(end_y)}H{_fmt(end_x)}"
+        
+        # Create the path data with a vertical bend
+        mid_y = (start_y + end_y) / 2
+        return f"M{_fmt(start_x)} {_fmt(start_y)}V{_fmt(mid_y)}H{_fmt(end_x)}V{_fmt(end_y)}"
     
-    def _calculate_entity_relation_path(self, source_x, source_y, source_width, source_height,
-                                       target_x, target_y, target_width, target_height):
+    @staticmethod
+    def _calculate_entity_relation_path(source_x, source_y, source_width, source_height,
+                                        target_x, target_y, target_width, target_height):
         """
         Calculate an entity relation path between two rectangles.
         
@@ -823,13 +1173,14 @@ class DiagramRenderer:
         """
         # For simplicity, use the elbow path for now
         # In a real implementation, this would have specific rules for ER diagrams
-        return self._calculate_elbow_path(
+        return DiagramRenderer._calculate_elbow_path(
             source_x, source_y, source_width, source_height,
             target_x, target_y, target_width, target_height
         )
     
-    def _calculate_intersection_point(self, line_start_x, line_start_y, line_end_x, line_end_y,
-                                     rect_x, rect_y, rect_width, rect_height):
+    @staticmethod
+    def _calculate_intersection_point(line_start_x, line_start_y, line_end_x, line_end_y,
+                                      rect_x, rect_y, rect_width, rect_height):
         """
         Calculate the intersection point of a line with a rectangle.
         
@@ -845,134 +1196,67 @@ class DiagramRenderer:
         Returns:
             tuple: (x, y) coordinates of the intersection point
         """
-        # Calculate the rectangle's corners
-        left = rect_x
-        right = rect_x + rect_width
-        top = rect_y
-        bottom = rect_y + rect_height
-        
-        # Calculate the direction vector of the line
+        # Direction of the line. It doesn't need to be normalized, since
+        # only the ratios between the distances along it are compared
         dx = line_end_x - line_start_x
         dy = line_end_y - line_start_y
         
-        # Normalize the direction vector
-        length = math.sqrt(dx * dx + dy * dy)
-        if length > 0:
-            dx /= length
-            dy /= length
-        
-        # Calculate intersection with each edge of the rectangle
-        # and find the closest valid intersection
-        
-        # Intersection with left edge
-        if dx != 0:
-            t_left = (left - line_start_x) / dx
-            y_left = line_start_y + t_left * dy
-            if top <= y_left <= bottom and t_left >= 0:
-                return (left, y_left)
-        
-        # Intersection with right edge
-        if dx != 0:
-            t_right = (right - line_start_x) / dx
-            y_right = line_start_y + t_right * dy
-            if top <= y_right <= bottom and t_right >= 0:
-                return (right, y_right)
-        
-        # Intersection with top edge
-        if dy != 0:
-            t_top = (top - line_start_y) / dy
-            x_top = line_start_x + t_top * dx
-            if left <= x_top <= right and t_top >= 0:
-                return (x_top, top)
-        
-        # Intersection with bottom edge
-        if dy != 0:
-            t_bottom = (bottom - line_start_y) / dy
-            x_bottom = line_start_x + t_bottom * dx
-            if left <= x_bottom <= right and t_bottom >= 0:
-                return (x_bottom, bottom)
-        
-        # If no intersection is found, return the center of the rectangle
-        # (this should not happen if the line starts from the center)
-        return (rect_x + rect_width / 2, rect_y + rect_height / 2)
-    
-    def _add_arrow_marker(self, parent_element, marker_id, arrow_type, style_dict):
+        # Vertical and horizontal lines, common between aligned shapes,
+        # leave straight through the side they point at
+        if dx == 0:
+            if dy == 0:
+                # The line has no length, so use the center of the rectangle
+                return (rect_x + rect_width / 2, rect_y + rect_height / 2)
+            return (line_start_x, rect_y + rect_height if dy > 0 else rect_y)
+        if dy == 0:
+            return (rect_x + rect_width if dx > 0 else rect_x, line_start_y)
+        
+        # Clip the line against the rectangle Liang-Barsky style. It starts
+        # inside, so it leaves through the left or right side it points at,
+        # or the top or bottom one, whichever it reaches first
+        side_x = rect_x + rect_width if dx > 0 else rect_x
+        side_y = rect_y + rect_height if dy > 0 else rect_y
+        t_x = (side_x - line_start_x) / dx
+        t_y = (side_y - line_start_y) / dy
+        if t_x <= t_y:
+            # Leaves through the left or right side
+            return (side_x, line_start_y + t_x * dy)
+        
+        # Leaves through the top or bottom side
+        return (line_start_x + t_y * dx, side_y)
+    
+    def _arrow_marker_id(self, markers, arrow_type, stroke_color):
+        """
+        Get the ID of the marker for an arrow, assigning one on first use.
+        
+        Edges with the same arrow type and color share a single marker.
+        
+        Args:
+            markers (dict): The arrow markers used so far, mapping
+                (arrow type, stroke color) to the marker ID
+            arrow_type (str): The type of arrow (classic, block, open, etc.)
+            stroke_color (str): The stroke color of the edge
+            
+        Returns:
+            str: The marker ID
+        """
+        key = (arrow_type, stroke_color)
+        marker_id = markers.get(key)
+        if marker_id is None:
+            marker_id = markers[key] = f"arrow-{len(markers)}"
+        return marker_id
+    
+    def _add_arrow_marker(self, write, marker_id, arrow_type, stroke_color):
         """
         Add an arrow marker definition to the SVG.
         
-        This method creates an SVG marker element for arrow heads and adds it
-        to the parent element.
+        This method writes an SVG marker element for arrow heads. The caller
+        wraps the markers in a defs element.
         
         Args:
-            parent_element (Element): The SVG element to add the marker to
+            write (callable): Called with each SVG text fragment of the marker
             marker_id (str): The ID to use for the marker
             arrow_type (str): The type of arrow (classic, block, open, etc.)
-            style_dict (dict): Style properties for the arrow
-        """
-        # Create a defs element if it doesn't exist
-        defs = parent_element.find("defs")
-        if defs is None:
-            defs = ET.SubElement(parent_element, "defs")
-        
-        # Create the marker element
-        marker = ET.SubElement(defs, "marker", {
-            "id": marker_id,
-            "viewBox": "0 0 10 10",
-            "refX": "10",
-            "refY": "5",
-            "markerWidth": "6",
-            "markerHeight": "6",
-            "orient": "auto"
-        })
-        
-        # Get arrow color
-        stroke_color = style_dict.get("strokeColor", "#000000")
-        fill_color = stroke_color
-        if arrow_type == "open":
-            fill_color = "none"
-        
-        # Create the arrow path based on the type
-        if arrow_type == "classic":
-            # Classic arrow (triangle)
-            path = ET.SubElement(marker, "path", {
-                "d": "M 0 0 L 10 5 L 0 10 z",
-                "fill": fill_color,
-                "stroke": stroke_color
-            })
-        elif arrow_type == "block":
-            # Block arrow (rectangle)
-            path = ET.SubElement(marker, "path", {
-                "d": "M 0 0 L 10 0 L 10 10 L 0 10 z",
-                "fill": fill_color,
-                "stroke": stroke_color
-            })
-        elif arrow_type == "open":
-            # Open arrow (V shape)
-            path = ET.SubElement(marker, "path", {
-                "d": "M 0 0 L 10 5 L 0 10",
-                "fill": "none",
-                "stroke": stroke_color
-            })
-        elif arrow_type == "oval":
-            # Oval arrow (circle)
-            circle = ET.SubElement(marker, "circle", {
-                "cx": "5",
-                "cy": "5",
-                "r": "5",
-                "fill": fill_color,
-                "stroke": stroke_color
-            })
-        elif arrow_type == "diamond":
-            # Diamond arrow
-            path = ET.SubElement(marker, "path", {
-                "d": "M 0 5 L 5 0 L 10 5 L 5 10 z",
-                "fill": fill_color,
-                "stroke": stroke_color
-            })
-        else:
-            # Default to classic arrow
-            path = ET.SubElement(marker, "path", {
-                "d": "M 0 0 L 10 5 L 0 10 z",
-                "fill": fill_color,
-                "stroke": stroke_color
-            })
+            stroke_color (str): The color of the arrow
+        """
+        write(_arrow_marker_svg(marker_id, arrow_type, stroke_color))
@@ -0,0 +1,42 @@
+"""
+Internal helpers shared by the drawpyo subpackages.
+"""
+
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(file_path, buffering=-1):
+    """
+    Open a file for writing text so that it only replaces file_path once
+    everything has been written.
+    
+    The text goes to a temporary file in the same directory, which is moved
+    onto file_path when the with block completes. If the block raises, the
+    temporary file is deleted and any existing file at file_path is left
+    untouched rather than truncated.
+    
+    Args:
+        file_path (str): Path of the file to write
+        buffering (int): Buffer size passed on to open
+        
+    Yields:
+        file: The temporary file, opened for writing UTF-8 text
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, "x", encoding="utf-8", buffering=buffering) as f:
+            yield f
+        
+        # Keep the permissions of the file being replaced
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
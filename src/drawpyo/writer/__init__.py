@@ -22,15 +22,38 @@ Technical details:
 """
 
 import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom
+from xml.sax.saxutils import quoteattr
 import os
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from ..diagram.objects import Object
 from ..diagram.edges import Edge
 from ..page import Page
 from ..file import File
 from ..reader.decompressor import DrawioDecompressor
+from ..utils import atomic_write
+
+
+@lru_cache(maxsize=4096)
+def _format_number(value):
+    """
+    Format a geometry value for an XML attribute.
+    
+    Floats holding a whole number are written as integers, so a position
+    of 100.0 is stored as "100" the way drawio itself writes it. Anything
+    else is written with str, which keeps full precision. Geometry mostly
+    sits on the grid, so the cache serves nearly every call.
+    
+    Args:
+        value (int or float): The number to format
+        
+    Returns:
+        str: The formatted number
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
 
 
 class DrawioWriter:
@@ -52,13 +75,16 @@ class DrawioWriter:
         xml_content = writer.convert_file_to_xml(file)
     """
     
-    def __init__(self, compress_content=True):
+    def __init__(self, compress_content=True, compression_level=9):
         """
         Initialize the writer with configuration options.
         
         Args:
             compress_content (bool): Whether to compress diagram content using base64+deflate.
                 Default is True, which matches the behavior of the drawio application.
+            compression_level (int): The zlib level used when compressing content.
+                Default is 9, the smallest output. Level 1 compresses several
+                times faster at a slightly worse ratio, which suits autosaves.
                 
         Example:
             # Create a writer with default settings (compressed content)
@@ -66,22 +92,36 @@ class DrawioWriter:
             
             # Create a writer that doesn't compress content (for debugging)
             writer = DrawioWriter(compress_content=False)
+            
+            # Create a writer tuned for fast, frequent saves
+            writer = DrawioWriter(compression_level=1)
         """
         self.compress_content = compress_content
+        self.compression_level = compression_level
+        
+        # The element building is shared with PythonToXmlConverter
+        self._converter = PythonToXmlConverter()
     
-    def write_file(self, file, file_path):
+    def write_file(self, file, file_path, modified=None):
         """
         Write a drawpyo File object to a drawio file.
         
         This method converts a drawpyo File object to drawio XML format and
-        writes it to the specified file path.
+        writes it to the specified file path. If any page fails to convert,
+        an existing file at that path is left as it was.
         
         Args:
             file (File): The drawpyo File object to write
             file_path (str): Path where the drawio file should be saved
+            modified (str, optional): The timestamp stored in the mxfile's
+                modified attribute. Defaults to the current time, so batch
+                exports can pass one shared timestamp instead.
             
         Returns:
-            bool: True if the file was written successfully, False otherwise
+            bool: True once the file has been written
+            
+        Raises:
+            ValueError: If the file cannot be converted or written
             
         Example:
             # Create or modify a drawpyo File
@@ -98,27 +138,41 @@ class DrawioWriter:
             
             # Write the file to disk
             writer = DrawioWriter()
-            success = writer.write_file(file, "output.drawio")
-            
-            if success:
-                print("File written successfully")
-            else:
-                print("Failed to write file")
+            try:
+                writer.write_file(file, "output.drawio")
+            except ValueError as e:
+                print(f"Error: {e}")
         """
         try:
-            # Convert the File to XML
-            xml_content = self.convert_file_to_xml(file)
-            
-            # Write the XML to the file
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(xml_content)
+            # Write the XML to the file a page at a time, so only one page's
+            # elements are held in memory at once. ElementTree issues many
+            # small writes, so a 256 KB buffer batches them into few syscalls.
+            # The file is only replaced once every page has been written
+            with atomic_write(file_path, buffering=262144) as f:
+                attributes = "".join(
+                    f" {name}={quoteattr(value)}"
+                    for name, value in self._converter.file_attributes(
+                        file, modified
+                    ).items()
+                )
+                f.write(f'<?xml version="1.0" ?>\n<mxfile{attributes}>\n')
+                
+                for page in file.pages:
+                    diagram_elem = self._converter.convert_page_to_diagram(
+                        page, self.compress_content, self.compression_level
+                    )
+                    ET.indent(diagram_elem, space="  ", level=1)
+                    f.write("  ")
+                    ET.ElementTree(diagram_elem).write(f, encoding="unicode")
+                    f.write("\n")
+                
+                f.write("</mxfile>\n")
                 
             return True
         except Exception as e:
-            print(f"Error writing file: {str(e)}")
-            return False
+            raise ValueError(f"Failed to write drawio file: {str(e)}") from e
     
-    def convert_file_to_xml(self, file):
+    def convert_file_to_xml(self, file, modified=None):
         """
         Convert a drawpyo File object to drawio XML format.
         
@@ -127,6 +181,8 @@ class DrawioWriter:
         
         Args:
             file (File): The drawpyo File object to convert
+            modified (str, optional): The timestamp stored in the mxfile's
+                modified attribute. Defaults to the current time.
             
         Returns:
             str: The drawio XML content as a string
@@ -151,249 +207,23 @@ class DrawioWriter:
             # Do something with the XML content
             print(xml_content)
         """
-        # Create the root mxfile element
-        root = ET.Element("mxfile")
-        
-        # Set file attributes
-        root.set("host", file.host if hasattr(file, "host") else "app.diagrams.net")
-        root.set("modified", datetime.now().isoformat())
-        root.set("agent", "drawpyo")
-        root.set("version", file.version if hasattr(file, "version") else "21.6.5")
-        root.set("type", file.type if hasattr(file, "type") else "device")
-        
-        # Add each page as a diagram
-        for page in file.pages:
-            diagram_elem = self._convert_page_to_diagram(page)
-            root.append(diagram_elem)
+        # Build the mxfile element
+        root = self._converter.convert_file_to_mxfile(
+            file, self.compress_content, modified, self.compression_level
+        )
         
         # Convert the XML to a pretty string
         xml_str = self._prettify_xml(root)
         
         return xml_str
     
-    def _convert_page_to_diagram(self, page):
-        """
-        Convert a drawpyo Page to a drawio diagram element.
-        
-        This method converts a drawpyo Page object to an XML Element
-        representing a diagram in the drawio format.
-        
-        Args:
-            page (Page): The drawpyo Page object to convert
-            
-        Returns:
-            Element: An XML Element representing the diagram
-        """
-        # Create the diagram element
-        diagram_elem = ET.Element("diagram")
-        
-        # Set diagram attributes
-        diagram_elem.set("id", page.id if hasattr(page, "id") else str(uuid.uuid4()))
-        diagram_elem.set("name", page.name)
-        
-        # Convert the page content to mxGraphModel
-        graph_model = self._convert_page_to_graph_model(page)
-        
-        # Convert the graph model to XML string
-        graph_xml = ET.tostring(graph_model, encoding="unicode")
-        
-        # Compress the content if requested
-        if self.compress_content:
-            compressed = DrawioDecompressor.compress(graph_xml)
-            diagram_elem.text = compressed
-        else:
-            diagram_elem.text = graph_xml
-        
-        return diagram_elem
-    
-    def _convert_page_to_graph_model(self, page):
-        """
-        Convert a drawpyo Page to an mxGraphModel element.
-        
-        This method converts a drawpyo Page object to an XML Element
-        representing an mxGraphModel in the drawio format.
-        
-        Args:
-            page (Page): The drawpyo Page object to convert
-            
-        Returns:
-            Element: An XML Element representing the mxGraphModel
-        """
-        # Create the mxGraphModel element
-        graph_model = ET.Element("mxGraphModel")
-        
-        # Set graph model attributes
-        graph_model.set("dx", "0")
-        graph_model.set("dy", "0")
-        graph_model.set("grid", "1")
-        graph_model.set("gridSize", "10")
-        graph_model.set("guides", "1")
-        graph_model.set("tooltips", "1")
-        graph_model.set("connect", "1")
-        graph_model.set("arrows", "1")
-        graph_model.set("fold", "1")
-        graph_model.set("page", "1")
-        graph_model.set("pageScale", "1")
-        graph_model.set("pageWidth", "850")
-        graph_model.set("pageHeight", "1100")
-        graph_model.set("background", "#ffffff")
-        
-        # Create the root element
-        root = ET.SubElement(graph_model, "root")
-        
-        # Add the special cells (0 and 1)
-        ET.SubElement(root, "mxCell", {"id": "0"})
-        ET.SubElement(root, "mxCell", {"id": "1", "parent": "0"})
-        
-        # Add all objects and edges
-        self._add_objects_to_root(root, page)
-        
-        return graph_model
-    
-    def _add_objects_to_root(self, root, page):
-        """
-        Add all objects and edges from a page to the root element.
-        
-        This method converts drawpyo Objects and Edges to mxCell elements
-        and adds them to the root element.
-        
-        Args:
-            root (Element): The root XML Element to add objects to
-            page (Page): The drawpyo Page containing the objects
-        """
-        # Create a mapping of objects to IDs
-        obj_to_id = {}
-        
-        # Assign IDs to all objects
-        next_id = 2  # IDs 0 and 1 are reserved
-        for obj in page.objects:
-            obj_to_id[obj] = str(next_id)
-            next_id += 1
-        
-        # Add all objects first
-        for obj in page.objects:
-            if isinstance(obj, Object) and not isinstance(obj, Edge):
-                self._add_object_to_root(root, obj, obj_to_id)
-        
-        # Then add all edges
-        for obj in page.objects:
-            if isinstance(obj, Edge):
-                self._add_edge_to_root(root, obj, obj_to_id)
-    
-    def _add_object_to_root(self, root, obj, obj_to_id):
-        """
-        Add a drawpyo Object to the root element.
-        
-        This method converts a drawpyo Object to an mxCell element
-        and adds it to the root element.
-        
-        Args:
-            root (Element): The root XML Element to add the object to
-            obj (Object): The drawpyo Object to convert
-            obj_to_id (dict): Mapping of objects to their IDs
-        """
-        # Get the object ID
-        obj_id = obj_to_id[obj]
-        
-        # Get the parent ID
-        parent_id = "1"  # Default parent is 1
-        if hasattr(obj, "parent") and obj.parent and obj.parent in obj_to_id:
-            parent_id = obj_to_id[obj.parent]
-        
-        # Create the mxCell element
-        cell = ET.SubElement(root, "mxCell", {
-            "id": obj_id,
-            "parent": parent_id,
-            "vertex": "1",
-            "value": obj.value if hasattr(obj, "value") and obj.value else ""
-        })
-        
-        # Add style if available
-        if hasattr(obj, "get_style_string"):
-            style = obj.get_style_string()
-            if style:
-                cell.set("style", style)
-        
-        # Add geometry
-        if hasattr(obj, "position") and hasattr(obj, "width") and hasattr(obj, "height"):
-            x, y = obj.position
-            width = obj.width
-            height = obj.height
-            
-            geometry = ET.SubElement(cell, "mxGeometry", {
-                "x": str(x),
-                "y": str(y),
-                "width": str(width),
-                "height": str(height),
-                "as": "geometry"
-            })
-    
-    def _add_edge_to_root(self, root, edge, obj_to_id):
-        """
-        Add a drawpyo Edge to the root element.
-        
-        This method converts a drawpyo Edge to an mxCell element
-        and adds it to the root element.
-        
-        Args:
-            root (Element): The root XML Element to add the edge to
-            edge (Edge): The drawpyo Edge to convert
-            obj_to_id (dict): Mapping of objects to their IDs
-        """
-        # Get the edge ID
-        edge_id = obj_to_id[edge]
-        
-        # Get the parent ID
-        parent_id = "1"  # Default parent is 1
-        if hasattr(edge, "parent") and edge.parent and edge.parent in obj_to_id:
-            parent_id = obj_to_id[edge.parent]
-        
-        # Create the mxCell element
-        cell_attrs = {
-            "id": edge_id,
-            "parent": parent_id,
-            "edge": "1",
-            "value": edge.label if hasattr(edge, "label") and edge.label else ""
-        }
-        
-        # Add source and target if available
-        if hasattr(edge, "source") and edge.source and edge.source in obj_to_id:
-            cell_attrs["source"] = obj_to_id[edge.source]
-        
-        if hasattr(edge, "target") and edge.target and edge.target in obj_to_id:
-            cell_attrs["target"] = obj_to_id[edge.target]
-        
-        cell = ET.SubElement(root, "mxCell", cell_attrs)
-        
-        # Add style if available
-        if hasattr(edge, "get_style_string"):
-            style = edge.get_style_string()
-            if style:
-                cell.set("style", style)
-        
-        # Add geometry (for edge routing)
-        geometry = ET.SubElement(cell, "mxGeometry", {
-            "relative": "1",
-            "as": "geometry"
-        })
-        
-        # Add points if available
-        if hasattr(edge, "points") and edge.points:
-            points_array = ET.SubElement(geometry, "Array", {"as": "points"})
-            
-            for point in edge.points:
-                x, y = point
-                ET.SubElement(points_array, "mxPoint", {
-                    "x": str(x),
-                    "y": str(y)
-                })
-    
     def _prettify_xml(self, elem):
         """
         Convert an XML Element to a pretty-printed string.
         
         This method takes an XML Element and returns a nicely formatted
-        string representation with proper indentation.
+        string representation with proper indentation. The element is
+        indented in place rather than serialized and reparsed.
         
         Args:
             elem (Element): The XML Element to prettify
@@ -401,14 +231,11 @@ class DrawioWriter:
         Returns:
             str: The pretty-printed XML string
         """
-        # Convert to string
-        rough_string = ET.tostring(elem, 'utf-8')
+        # Indent in place with 2 spaces
+        ET.indent(elem, space="  ")
         
-        # Parse with minidom
-        reparsed = minidom.parseString(rough_string)
-        
-        # Pretty print with 2-space indentation
-        return reparsed.toprettyxml(indent="  ")
+        # Convert to string
+        return ET.tostring(elem, encoding="unicode", xml_declaration=True)
 
 
 class PythonToXmlConverter:
@@ -443,7 +270,9 @@ class PythonToXmlConverter:
         """
         pass
     
-    def convert_file_to_mxfile(self, file):
+    def convert_file_to_mxfile(
+        self, file, compress=True, modified=None, compression_level=9
+    ):
         """
         Convert a drawpyo File to an mxfile XML element.
         
@@ -452,6 +281,10 @@ class PythonToXmlConverter:
         
         Args:
             file (File): The drawpyo File object to convert
+            compress (bool): Whether to compress the diagram content
+            modified (str, optional): The timestamp stored in the mxfile's
+                modified attribute. Defaults to the current time.
+            compression_level (int): The zlib level used when compressing
             
         Returns:
             Element: An XML Element representing the mxfile
@@ -464,23 +297,45 @@ class PythonToXmlConverter:
             xml_string = ET.tostring(mxfile, encoding="unicode")
         """
         # Create the root mxfile element
-        root = ET.Element("mxfile")
-        
-        # Set file attributes
-        root.set("host", file.host if hasattr(file, "host") else "app.diagrams.net")
-        root.set("modified", datetime.now().isoformat())
-        root.set("agent", "drawpyo")
-        root.set("version", file.version if hasattr(file, "version") else "21.6.5")
-        root.set("type", file.type if hasattr(file, "type") else "device")
+        root = ET.Element("mxfile", self.file_attributes(file, modified))
         
         # Add each page as a diagram
         for page in file.pages:
-            diagram_elem = self.convert_page_to_diagram(page)
+            diagram_elem = self.convert_page_to_diagram(
+                page, compress, compression_level
+            )
             root.append(diagram_elem)
         
         return root
     
-    def convert_page_to_diagram(self, page, compress=True):
+    def file_attributes(self, file, modified=None):
+        """
+        Get the attributes of the mxfile element for a drawpyo File.
+        
+        Args:
+            file (File): The drawpyo File object being converted
+            modified (str, optional): The timestamp stored in the mxfile's
+                modified attribute. Defaults to the current time.
+            
+        Returns:
+            dict: The mxfile attributes
+            
+        Example:
+            # Build an mxfile element by hand
+            mxfile = ET.Element("mxfile", converter.file_attributes(file))
+        """
+        if modified is None:
+            modified = datetime.now().isoformat(timespec="seconds")
+        
+        return {
+            "host": getattr(file, "host", "app.diagrams.net"),
+            "modified": modified,
+            "agent": "drawpyo",
+            "version": getattr(file, "version", "21.6.5"),
+            "type": getattr(file, "type", "device"),
+        }
+    
+    def convert_page_to_diagram(self, page, compress=True, compression_level=9):
         """
         Convert a drawpyo Page to a diagram XML element.
         
@@ -490,6 +345,7 @@ class PythonToXmlConverter:
         Args:
             page (Page): The drawpyo Page object to convert
             compress (bool): Whether to compress the diagram content
+            compression_level (int): The zlib level used when compressing
             
         Returns:
             Element: An XML Element representing the diagram
@@ -502,25 +358,26 @@ class PythonToXmlConverter:
         diagram_elem = ET.Element("diagram")
         
         # Set diagram attributes
-        diagram_elem.set("id", page.id if hasattr(page, "id") else str(uuid.uuid4()))
+        page_id = getattr(page, "id", None)
+        diagram_elem.set("id", str(page_id) if page_id is not None else str(uuid.uuid4()))
         diagram_elem.set("name", page.name)
         
-        # Convert the page content to mxGraphModel
-        graph_model = self.convert_page_to_graph_model(page)
-        
-        # Convert the graph model to XML string
-        graph_xml = ET.tostring(graph_model, encoding="unicode")
-        
         # Compress the content if requested
         if compress:
-            compressed = DrawioDecompressor.compress(graph_xml)
-            diagram_elem.text = compressed
+            # Convert the page content to mxGraphModel and compress it as
+            # it's serialized
+            graph_model = self.convert_page_to_graph_model(page)
+            diagram_elem.text = DrawioDecompressor.compress_element(
+                graph_model, compression_level
+            )
         else:
-            diagram_elem.text = graph_xml
+            # Build the mxGraphModel directly inside the diagram, which is
+            # how drawio stores uncompressed diagrams
+            self.convert_page_to_graph_model(page, diagram_elem)
         
         return diagram_elem
     
-    def convert_page_to_graph_model(self, page):
+    def convert_page_to_graph_model(self, page, parent=None):
         """
         Convert a drawpyo Page to an mxGraphModel XML element.
         
@@ -529,6 +386,8 @@ class PythonToXmlConverter:
         
         Args:
             page (Page): The drawpyo Page object to convert
+            parent (Element, optional): An element to create the mxGraphModel
+                in. By default it's created on its own.
             
         Returns:
             Element: An XML Element representing the mxGraphModel
@@ -538,7 +397,10 @@ class PythonToXmlConverter:
             graph_model = converter.convert_page_to_graph_model(page)
         """
         # Create the mxGraphModel element
-        graph_model = ET.Element("mxGraphModel")
+        if parent is None:
+            graph_model = ET.Element("mxGraphModel")
+        else:
+            graph_model = ET.SubElement(parent, "mxGraphModel")
         
         # Set graph model attributes
         graph_model.set("dx", "0")
@@ -563,24 +425,25 @@ class PythonToXmlConverter:
         ET.SubElement(root, "mxCell", {"id": "0"})
         ET.SubElement(root, "mxCell", {"id": "1", "parent": "0"})
         
-        # Create a mapping of objects to IDs
+        # Assign IDs to all objects and sort them into shapes and edges in
+        # a single pass
         obj_to_id = {}
-        
-        # Assign IDs to all objects
-        next_id = 2  # IDs 0 and 1 are reserved
-        for obj in page.objects:
+        objects = []
+        edges = []
+        for next_id, obj in enumerate(page.objects, start=2):  # IDs 0 and 1 are reserved
             obj_to_id[obj] = str(next_id)
-            next_id += 1
+            if isinstance(obj, Edge):
+                edges.append(obj)
+            elif isinstance(obj, Object):
+                objects.append(obj)
         
         # Add all objects first
-        for obj in page.objects:
-            if isinstance(obj, Object) and not isinstance(obj, Edge):
-                self.convert_object_to_cell(root, obj, obj_to_id)
+        for obj in objects:
+            self.convert_object_to_cell(root, obj, obj_to_id)
         
         # Then add all edges
-        for obj in page.objects:
-            if isinstance(obj, Edge):
-                self.convert_edge_to_cell(root, obj, obj_to_id)
+        for edge in edges:
+            self.convert_edge_to_cell(root, edge, obj_to_id)
         
         return graph_model
     
@@ -608,35 +471,33 @@ class PythonToXmlConverter:
         obj_id = obj_to_id[obj]
         
         # Get the parent ID
-        parent_id = "1"  # Default parent is 1
-        if hasattr(obj, "parent") and obj.parent and obj.parent in obj_to_id:
-            parent_id = obj_to_id[obj.parent]
+        parent_id = obj_to_id.get(getattr(obj, "parent", None), "1")  # Default parent is 1
         
         # Create the mxCell element
         cell = ET.SubElement(root, "mxCell", {
             "id": obj_id,
             "parent": parent_id,
             "vertex": "1",
-            "value": obj.value if hasattr(obj, "value") and obj.value else ""
+            "value": getattr(obj, "value", None) or ""
         })
         
         # Add style if available
-        if hasattr(obj, "get_style_string"):
-            style = obj.get_style_string()
-            if style:
-                cell.set("style", style)
+        style = getattr(obj, "style", None)
+        if style:
+            cell.set("style", style)
         
         # Add geometry
-        if hasattr(obj, "position") and hasattr(obj, "width") and hasattr(obj, "height"):
-            x, y = obj.position
+        position = getattr(obj, "position", None)
+        if position is not None:
+            x, y = position
             width = obj.width
             height = obj.height
             
             geometry = ET.SubElement(cell, "mxGeometry", {
-                "x": str(x),
-                "y": str(y),
-                "width": str(width),
-                "height": str(height),
+                "x": _format_number(x),
+                "y": _format_number(y),
+                "width": _format_number(width),
+                "height": _format_number(height),
                 "as": "geometry"
             })
         
@@ -666,32 +527,31 @@ class PythonToXmlConverter:
         edge_id = obj_to_id[edge]
         
         # Get the parent ID
-        parent_id = "1"  # Default parent is 1
-        if hasattr(edge, "parent") and edge.parent and edge.parent in obj_to_id:
-            parent_id = obj_to_id[edge.parent]
+        parent_id = obj_to_id.get(getattr(edge, "parent", None), "1")  # Default parent is 1
         
         # Create the mxCell element
         cell_attrs = {
             "id": edge_id,
             "parent": parent_id,
             "edge": "1",
-            "value": edge.label if hasattr(edge, "label") and edge.label else ""
+            "value": getattr(edge, "label", None) or ""
         }
         
         # Add source and target if available
-        if hasattr(edge, "source") and edge.source and edge.source in obj_to_id:
-            cell_attrs["source"] = obj_to_id[edge.source]
+        source_id = obj_to_id.get(getattr(edge, "source", None))
+        if source_id is not None:
+            cell_attrs["source"] = source_id
         
-        if hasattr(edge, "target") and edge.target and edge.target in obj_to_id:
-            cell_attrs["target"] = obj_to_id[edge.target]
+        target_id = obj_to_id.get(getattr(edge, "target", None))
+        if target_id is not None:
+            cell_attrs["target"] = target_id
         
         cell = ET.SubElement(root, "mxCell", cell_attrs)
         
         # Add style if available
-        if hasattr(edge, "get_style_string"):
-            style = edge.get_style_string()
-            if style:
-                cell.set("style", style)
+        style = getattr(edge, "style", None)
+        if style:
+            cell.set("style", style)
         
         # Add geometry (for edge routing)
         geometry = ET.SubElement(cell, "mxGeometry", {
@@ -700,14 +560,16 @@ class PythonToXmlConverter:
         })
         
         # Add points if available
-        if hasattr(edge, "points") and edge.points:
+        points = getattr(edge, "points", None)
+        if points:
             points_array = ET.SubElement(geometry, "Array", {"as": "points"})
             
-            for point in edge.points:
-                x, y = point
-                ET.SubElement(points_array, "mxPoint", {
-                    "x": str(x),
-                    "y": str(y)
+            # Bind the element factory locally, it's called once per point
+            sub_element = ET.SubElement
+            for x, y in points:
+                sub_element(points_array, "mxPoint", {
+                    "x": _format_number(x),
+                    "y": _format_number(y)
                 })
         
         return cell
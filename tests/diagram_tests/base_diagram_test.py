@@ -8,3 +8,19 @@ def test_diagram_base_init():
     assert test_dbase.xml_class == "xml_tag"
     assert test_dbase.page == test_page
     assert test_dbase.style_attributes == ["html"]
+
+
+def test_apply_style_string_shared():
+    test_style_str = "ellipse;fillColor=#dae8fc;strokeWidth=2;"
+
+    first = drawpyo.diagram.DiagramBase()
+    first.apply_style_string(test_style_str)
+    second = drawpyo.diagram.DiagramBase()
+    second.apply_style_string(test_style_str)
+    second.fillColor = "#ffffff"
+
+    assert first.baseStyle == "ellipse"
+    assert first.strokeWidth == 2
+    assert first.fillColor == "#dae8fc"
+    assert second.style_attributes == ["html", "fillColor", "strokeWidth"]
+    assert first.style_attributes is not second.style_attributes
@@ -60,3 +60,15 @@ def test_page_xml():
             close_tag_3,
         ]
     )
+
+
+def test_page_add_remove_object():
+    test_page = drawpyo.Page()
+    obj = drawpyo.diagram.Object(page=test_page)
+    test_page.add_object(obj)
+    assert test_page.objects.count(obj) == 1
+
+    test_page.remove_object(obj)
+    assert obj not in test_page.objects
+    test_page.add_object(obj)
+    assert test_page.objects[-1] is obj
@@ -0,0 +1,345 @@
+import base64
+import os
+
+import pytest
+
+import drawpyo
+from drawpyo.reader import DrawioDecompressor, DrawioReader
+
+GRAPH_MODEL = (
+    "<mxGraphModel><root>"
+    '<mxCell id="0" />'
+    '<mxCell id="1" parent="0" />'
+    '<mxCell id="2" value="Child" vertex="1" parent="3">'
+    '<mxGeometry x="10" y="20" width="30" height="40" as="geometry" />'
+    "</mxCell>"
+    '<mxCell id="3" value="Container" style="rounded=1;fillColor=#dae8fc;" '
+    'vertex="1" parent="1">'
+    '<mxGeometry x="100" y="200" width="300" height="400" as="geometry" />'
+    "</mxCell>"
+    '<mxCell id="4" value="Leaf" vertex="1" parent="1">'
+    '<mxGeometry x="500" y="200" width="120" height="60" as="geometry" />'
+    "</mxCell>"
+    '<mxCell id="5" value="Link" style="edgeStyle=orthogonalEdgeStyle;" '
+    'edge="1" parent="1" source="3" target="4">'
+    '<mxGeometry relative="1" as="geometry" />'
+    "</mxCell>"
+    "</root></mxGraphModel>"
+)
+
+
+def mxfile_string(graph_model=GRAPH_MODEL, pages=1):
+    diagrams = "".join(
+        f'<diagram id="d{n}" name="Page-{n}">\n'
+        f"{DrawioDecompressor.compress(graph_model)}\n"
+        "</diagram>"
+        for n in range(1, pages + 1)
+    )
+    return (
+        '<mxfile host="Electron" version="24.1.0" type="device">'
+        f"{diagrams}</mxfile>"
+    )
+
+
+def test_read_xml_string():
+    file = DrawioReader.read_xml_string(mxfile_string(pages=2))
+    assert isinstance(file, drawpyo.File)
+    assert [page.name for page in file.pages] == ["Page-1", "Page-2"]
+    assert file.host == "Electron"
+
+
+def test_read_objects_and_relationships():
+    page = DrawioReader.read_xml_string(mxfile_string()).pages[0]
+    objects = [obj for obj in page.objects if isinstance(obj, drawpyo.diagram.Object)]
+    edges = [obj for obj in page.objects if isinstance(obj, drawpyo.diagram.Edge)]
+    child, container, leaf = objects
+    (edge,) = edges
+
+    assert container.value == "Container"
+    assert container.fillColor == "#dae8fc"
+    assert container.position == (100, 200)
+    assert (container.width, container.height) == (300, 400)
+
+    # The child references its parent before the parent is declared
+    assert child.parent is container
+    assert child in container.children
+    assert child.position_rel_to_parent == (10, 20)
+
+    assert edge.source is container
+    assert edge.target is leaf
+    assert edge in container.out_edges
+    assert edge in leaf.in_edges
+
+
+def test_compress_round_trip():
+    compressed = DrawioDecompressor.compress(GRAPH_MODEL)
+    assert DrawioDecompressor.is_compressed(compressed)
+    assert not DrawioDecompressor.is_compressed(GRAPH_MODEL)
+    assert DrawioDecompressor.decompress(compressed) == GRAPH_MODEL
+
+
+def test_deferred_styles():
+    from drawpyo.reader import DrawioParser, XmlToPythonConverter
+
+    parsed = DrawioParser().parse_xml_string(mxfile_string())
+    page = XmlToPythonConverter(apply_styles=False).convert_file(parsed).pages[0]
+    container = page.objects[3]
+
+    assert container.value == "Container"
+    assert container.fillColor is None
+    assert container.raw_style == "rounded=1;fillColor=#dae8fc;"
+
+    container.apply_style_string(container.raw_style)
+    assert container.fillColor == "#dae8fc"
+
+
+def test_is_compressed_after_long_indent():
+    from xml.sax.saxutils import escape
+
+    indent = "\n" + " " * 100
+    assert not DrawioDecompressor.is_compressed(indent + GRAPH_MODEL)
+    assert DrawioDecompressor.is_compressed(
+        indent + DrawioDecompressor.compress(GRAPH_MODEL)
+    )
+
+    # An uncompressed model stored as the diagram's text
+    xml_string = (
+        '<mxfile host="Electron">'
+        '<diagram id="d1" name="Page-1">'
+        f"{escape(indent + GRAPH_MODEL + indent)}"
+        "</diagram>"
+        "</mxfile>"
+    )
+    page = DrawioReader.read_xml_string(xml_string).pages[0]
+    assert [obj.value for obj in page.objects[2:]] == [
+        "Child",
+        "Container",
+        "Leaf",
+        "Link",
+    ]
+
+
+def test_read_uncompressed_diagram():
+    xml_string = (
+        '<mxfile host="Electron">'
+        f'<diagram id="d1" name="Page-1">{GRAPH_MODEL}</diagram>'
+        "</mxfile>"
+    )
+    page = DrawioReader.read_xml_string(xml_string).pages[0]
+    assert [obj.value for obj in page.objects[2:]] == [
+        "Child",
+        "Container",
+        "Leaf",
+        "Link",
+    ]
+
+
+def test_iter_decompress_chunks():
+    compressed = DrawioDecompressor.compress(GRAPH_MODEL)
+    chunks = list(DrawioDecompressor.iter_decompress(compressed, chunk_size=64))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 64 for chunk in chunks)
+    assert b"".join(chunks).decode("utf-8") == GRAPH_MODEL
+
+
+def test_iter_decompress_truncated():
+    raw = base64.b64decode(DrawioDecompressor.compress(GRAPH_MODEL))
+    truncated = base64.b64encode(raw[: len(raw) // 2]).decode("ascii")
+    with pytest.raises(ValueError, match="truncated stream"):
+        list(DrawioDecompressor.iter_decompress(truncated))
+
+
+def test_placeholders_for_layers_and_referenced_cells():
+    graph_model = (
+        "<mxGraphModel><root>"
+        '<mxCell id="0" />'
+        '<mxCell id="1" parent="0" />'
+        '<mxCell id="layer" parent="0" />'
+        '<mxCell id="unused" parent="1" />'
+        '<mxCell id="group" parent="layer" />'
+        '<mxCell id="2" value="Shape" vertex="1" parent="group">'
+        '<mxGeometry x="10" y="20" width="30" height="40" as="geometry" />'
+        "</mxCell>"
+        '<mxCell id="spare" parent="0" />'
+        '<mxCell id="3" value="Other" vertex="1" parent="1">'
+        '<mxGeometry x="10" y="20" width="30" height="40" as="geometry" />'
+        "</mxCell>"
+        "</root></mxGraphModel>"
+    )
+    page = DrawioReader.read_xml_string(mxfile_string(graph_model)).pages[0]
+
+    # Kept in document order; the unreferenced non-layer cell is dropped
+    layer, group, shape, spare, other = page.objects[2:]
+    for placeholder in (layer, group, spare):
+        assert type(placeholder) is drawpyo.diagram.BasicObject
+    assert (shape.value, other.value) == ("Shape", "Other")
+    assert shape.parent is group
+    assert group.parent is layer
+
+
+def test_read_file(tmp_path):
+    file_path = tmp_path / "test.drawio"
+    file_path.write_text(mxfile_string(pages=2))
+
+    file = DrawioReader.read_file(str(file_path))
+    assert [page.name for page in file.pages] == ["Page-1", "Page-2"]
+    assert file.version == "24.1.0"
+    assert [obj.value for obj in file.pages[1].objects[2:]] == [
+        "Child",
+        "Container",
+        "Leaf",
+        "Link",
+    ]
+
+
+def test_decompress_bytes():
+    compressed = DrawioDecompressor.compress(GRAPH_MODEL)
+    assert DrawioDecompressor.decompress_bytes(compressed) == GRAPH_MODEL.encode(
+        "utf-8"
+    )
+
+
+def test_diagram_content_parsed_on_access():
+    from drawpyo.reader import DrawioParser
+
+    xml_string = mxfile_string().replace(
+        "</mxfile>",
+        '<diagram id="d2" name="Broken">bm90IGRlZmxhdGU=</diagram></mxfile>',
+    )
+    first, broken = DrawioParser().parse_xml_string(xml_string, lazy=True)["diagrams"]
+
+    assert broken["name"] == "Broken"
+    assert first["content"].tag == "mxGraphModel"
+    with pytest.raises(ValueError):
+        broken["content"]
+
+    # Without lazy the broken page fails the parse itself
+    with pytest.raises(ValueError, match="Broken"):
+        DrawioParser().parse_xml_string(xml_string)
+
+
+def test_diagrams_are_dicts():
+    from drawpyo.reader import DrawioParser
+
+    (diagram,) = DrawioParser().parse_xml_string(mxfile_string())["diagrams"]
+
+    assert type(diagram) is dict
+    assert list(diagram) == ["id", "name", "content"]
+    assert diagram["content"].tag == "mxGraphModel"
+    diagram["name"] = "Renamed"
+    assert diagram["name"] == "Renamed"
+
+
+def test_lazy_diagram_entry_mapping():
+    from drawpyo.reader import DrawioParser
+
+    (diagram,) = DrawioParser().parse_xml_string(mxfile_string(), lazy=True)["diagrams"]
+
+    assert "content" in diagram
+    assert list(diagram) == ["id", "name", "content"]
+    assert diagram.get("content").tag == "mxGraphModel"
+    assert diagram.get("missing") is None
+    assert dict(diagram)["content"] is diagram["content"]
+    assert dict(diagram.items()) == diagram.copy() == {
+        "id": "d1",
+        "name": "Page-1",
+        "content": diagram["content"],
+    }
+
+
+def test_read_file_cached_until_changed(tmp_path):
+    file_path = tmp_path / "test.drawio"
+    file_path.write_text(mxfile_string())
+
+    first = DrawioReader.read_file(str(file_path), use_cache=True)
+    second = DrawioReader.read_file(str(file_path), use_cache=True)
+    assert first.pages[0] is not second.pages[0]
+    assert [obj.value for obj in second.pages[0].objects[2:]] == [
+        "Child",
+        "Container",
+        "Leaf",
+        "Link",
+    ]
+
+    file_path.write_text(mxfile_string(pages=2))
+    assert len(DrawioReader.read_file(str(file_path), use_cache=True).pages) == 2
+
+    DrawioReader.clear_cache()
+    with pytest.raises(ValueError):
+        DrawioReader.read_file(str(tmp_path / "missing.drawio"), use_cache=True)
+
+
+def test_read_file_uncached_by_default(tmp_path):
+    from drawpyo.reader import reader
+
+    DrawioReader.clear_cache()
+    file_path = tmp_path / "test.drawio"
+    file_path.write_text(mxfile_string())
+    stat = os.stat(file_path)
+    assert DrawioReader.read_file(str(file_path)).pages[0].name == "Page-1"
+
+    # Same size and modification time, different content
+    file_path.write_text(mxfile_string().replace("Page-1", "Page-X"))
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert DrawioReader.read_file(str(file_path)).pages[0].name == "Page-X"
+    assert not reader._FILE_CACHE
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/fd"), reason="needs /dev/fd")
+def test_parse_file_from_pipe():
+    from drawpyo.reader import DrawioParser
+
+    read_fd, write_fd = os.pipe()
+    try:
+        with os.fdopen(write_fd, "w") as pipe:
+            pipe.write(mxfile_string(pages=2))
+
+        parsed = DrawioParser().parse_file(f"/dev/fd/{read_fd}")
+        assert [diagram["name"] for diagram in parsed["diagrams"]] == [
+            "Page-1",
+            "Page-2",
+        ]
+    finally:
+        os.close(read_fd)
+
+
+def test_shared_converter_releases_objects():
+    DrawioReader.read_xml_string(mxfile_string())
+    converter = DrawioReader._shared_reader().converter
+    assert converter.id_to_object == {}
+    assert converter._pending_edges == []
+
+
+def test_read_from_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    xml_string = mxfile_string(pages=3)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        files = list(pool.map(DrawioReader.read_xml_string, [xml_string] * 8))
+
+    for file in files:
+        assert [page.name for page in file.pages] == ["Page-1", "Page-2", "Page-3"]
+        assert len(file.pages[2].objects) == 6
+
+
+def test_read_file_memory_mapped(tmp_path, monkeypatch):
+    from drawpyo.reader import parser
+
+    monkeypatch.setattr(parser, "_MMAP_THRESHOLD", 0)
+    file_path = tmp_path / "test.drawio"
+    file_path.write_text(mxfile_string(pages=2))
+
+    parsed = parser.DrawioParser().parse_file(str(file_path))
+    assert [diagram["name"] for diagram in parsed["diagrams"]] == ["Page-1", "Page-2"]
+    assert parsed["diagrams"][1]["content"].tag == "mxGraphModel"
+
+
+def test_compress_element():
+    import xml.etree.ElementTree as ET
+
+    element = ET.fromstring(GRAPH_MODEL)
+    compressed = DrawioDecompressor.compress_element(element)
+    assert compressed == DrawioDecompressor.compress(
+        ET.tostring(element, encoding="utf-8")
+    )
+    assert DrawioDecompressor.decompress(compressed) == GRAPH_MODEL
@@ -0,0 +1,194 @@
+import re
+import xml.etree.ElementTree as ET
+
+import drawpyo
+from drawpyo.renderer import DiagramRenderer
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def sample_page():
+    page = drawpyo.Page()
+    source = drawpyo.diagram.Object(
+        page=page, value="Source", position=(0, 0), width=100, height=50
+    )
+    target = drawpyo.diagram.Object(
+        page=page, value="Target", position=(300, 200), width=100, height=50
+    )
+    target.apply_style_string("ellipse;fillColor=#dae8fc;")
+    drawpyo.diagram.Edge(page=page, source=source, target=target, label="Link")
+    return page
+
+
+def test_render_page_to_svg():
+    svg = ET.fromstring(DiagramRenderer().render_page_to_svg(sample_page()))
+
+    assert svg.get("width") == "440"
+    assert svg.get("height") == "290"
+
+    objects = svg.findall(f"{SVG}g/{SVG}g[@class='object']")
+    edges = svg.findall(f"{SVG}g/{SVG}g[@class='edge']")
+    assert len(objects) == 2
+    assert len(edges) == 1
+
+    texts = [text.text for text in svg.iter(f"{SVG}text")]
+    assert texts == ["Source", "Target", "Link"]
+
+    # Edge labels get a halo instead of a background rect
+    assert edges[0].find(f"{SVG}rect") is None
+    assert edges[0].find(f"{SVG}text").get("paint-order") == "stroke"
+
+    path = edges[0].find(f"{SVG}path")
+    (marker,) = svg.findall(f"{SVG}defs/{SVG}marker")
+    assert path.get("marker-end") == f"url(#{marker.get('id')})"
+
+
+def test_render_page_to_html():
+    html = DiagramRenderer().render_page_to_html(sample_page())
+    assert html.startswith("<!DOCTYPE html>")
+    assert "<svg" in html
+    assert "<script>" in html
+    assert "<script>" not in DiagramRenderer().render_page_to_html(
+        sample_page(), include_interactivity=False
+    )
+
+    page = sample_page()
+    page.name = "Flow <draft>"
+    html = DiagramRenderer().render_page_to_html(page)
+    assert "<title>Flow &lt;draft&gt;</title>" in html
+
+
+def test_render_style_defaults():
+    page = drawpyo.Page()
+    rounded = drawpyo.diagram.Object(page=page, position=(0, 0))
+    rounded.apply_style_string("rounded=1;strokeColor=#6c8ebf;")
+    square = drawpyo.diagram.Object(page=page, position=(200, 0))
+    square.apply_style_string("rounded=0;")
+
+    svg = ET.fromstring(DiagramRenderer().render_page_to_svg(page))
+    # The first rect is the page background
+    first, second = list(svg.iter(f"{SVG}rect"))[1:]
+    assert (first.get("rx"), first.get("stroke"), first.get("fill")) == (
+        "5",
+        "#6c8ebf",
+        "#ffffff",
+    )
+    assert (second.get("rx"), second.get("stroke")) == ("0", "#000000")
+
+
+def test_render_grid():
+    renderer = DiagramRenderer()
+    renderer.show_grid = True
+    svg = ET.fromstring(renderer.render_page_to_svg(sample_page()))
+
+    (grid,) = svg.findall(f"{SVG}g/{SVG}g[@class='grid']")
+    (path,) = grid
+    segments = path.get("d").split("M")[1:]
+    # 41 vertical lines from x=0 to 400 and 26 horizontal from y=0 to 250,
+    # offset by the padding
+    assert len(segments) == 41 + 26
+    assert segments[0] == "20 20V270"
+    assert segments[-1] == "20 270H420"
+
+
+def test_render_shared_arrow_markers():
+    page = sample_page()
+    source, target = page.objects[2:4]
+    drawpyo.diagram.Edge(page=page, source=target, target=source)
+
+    svg = ET.fromstring(DiagramRenderer().render_page_to_svg(page))
+    edges = svg.findall(f"{SVG}g/{SVG}g[@class='edge']")
+    paths = [edge.find(f"{SVG}path") for edge in edges]
+    assert len(paths) == 2
+    assert len(svg.findall(f"{SVG}defs/{SVG}marker")) == 1
+    assert paths[0].get("marker-end") == paths[1].get("marker-end")
+
+
+def test_render_viewport():
+    page = sample_page()
+    drawpyo.diagram.Object(
+        page=page, value="Far", position=(1000, 1000), width=100, height=50
+    )
+    renderer = DiagramRenderer()
+
+    svg = ET.fromstring(
+        renderer.render_page_to_svg(page, viewport=(250, 150, 450, 300))
+    )
+    assert (svg.get("width"), svg.get("height")) == ("240", "190")
+    texts = [text.text for text in svg.iter(f"{SVG}text")]
+    assert texts == ["Target", "Link"]
+    rect = svg.find(f"{SVG}g/{SVG}g[@class='object']/{SVG}rect")
+    assert (rect.get("x"), rect.get("y")) == ("70", "70")
+
+    svg = ET.fromstring(
+        renderer.render_page_to_svg(page, viewport=(900, 900, 1200, 1200))
+    )
+    texts = [text.text for text in svg.iter(f"{SVG}text")]
+    assert texts == ["Far"]
+
+
+def test_save_page(tmp_path):
+    page = sample_page()
+    renderer = DiagramRenderer()
+    file_path = tmp_path / "page.svg"
+
+    assert renderer.save_page_as_svg(page, str(file_path))
+    assert file_path.read_text(encoding="utf-8") == renderer.render_page_to_svg(page)
+
+    file_path = tmp_path / "page.html"
+    assert renderer.save_page_as_html(page, str(file_path))
+    assert file_path.read_text(encoding="utf-8") == renderer.render_page_to_html(page)
+
+
+def test_failed_save_keeps_existing_file(tmp_path, capsys):
+    renderer = DiagramRenderer()
+    broken = sample_page()
+    drawpyo.diagram.Object(page=broken, value=5)
+
+    for save, name in (
+        (renderer.save_page_as_svg, "page.svg"),
+        (renderer.save_page_as_html, "page.html"),
+    ):
+        file_path = tmp_path / name
+        assert save(sample_page(), str(file_path))
+        original = file_path.read_bytes()
+
+        assert not save(broken, str(file_path))
+        assert file_path.read_bytes() == original
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["page.html", "page.svg"]
+
+
+def test_intersection_point():
+    renderer = DiagramRenderer()
+    # A 100x50 rectangle centered on (50, 25)
+    rect = (0, 0, 100, 50)
+
+    assert renderer._calculate_intersection_point(50, 25, 300, 25, *rect) == (100, 25)
+    assert renderer._calculate_intersection_point(50, 25, 50, -200, *rect) == (50, 0)
+    assert renderer._calculate_intersection_point(50, 25, 25, 0, *rect) == (25, 0)
+    # Through the corner exactly
+    assert renderer._calculate_intersection_point(50, 25, -150, -75, *rect) == (0, 0)
+    # No direction at all
+    assert renderer._calculate_intersection_point(50, 25, 50, 25, *rect) == (50, 25)
+
+
+def test_intersection_point_ignores_line_length():
+    renderer = DiagramRenderer()
+    rect = (0, 0, 100, 50)
+    # The same direction at very different lengths gives the same point
+    points = {
+        renderer._calculate_intersection_point(50, 25, 50 + 4 * n, 25 + 1 * n, *rect)
+        for n in (0.25, 1, 7.5, 2**20)
+    }
+    assert points == {(100, 37.5)}
+
+
+def test_render_clear_cache():
+    renderer = DiagramRenderer()
+    first = renderer.render_page_to_svg(sample_page())
+    DiagramRenderer.clear_cache()
+    assert DiagramRenderer._calculate_orthogonal_path.cache_info().currsize == 0
+    # Object IDs differ between pages, so compare without them
+    second = renderer.render_page_to_svg(sample_page())
+    assert re.sub(r'data-id="\d+"', "", first) == re.sub(r'data-id="\d+"', "", second)
@@ -0,0 +1,70 @@
+from drawpyo.reader import StyleParser
+
+STYLE = "ellipse;fillColor=#f5f5f5;opacity=50;strokeWidth=1.5;dashed=true;"
+
+
+def test_parse_style():
+    assert StyleParser.parse_style(STYLE) == {
+        "baseStyle": "ellipse",
+        "fillColor": "#f5f5f5",
+        "opacity": 50,
+        "strokeWidth": 1.5,
+        "dashed": True,
+    }
+    assert StyleParser.parse_style("") == {}
+
+
+def test_parse_style_returns_a_copy():
+    style_dict = StyleParser.parse_style(STYLE)
+    style_dict["fillColor"] = "#ff0000"
+    assert StyleParser.parse_style(STYLE)["fillColor"] == "#f5f5f5"
+    assert StyleParser.get_style_value(STYLE, "fillColor") == "#f5f5f5"
+
+
+def test_parse_style_keeps_value_types():
+    assert StyleParser.parse_style("dashed=1;")["dashed"] is not True
+    assert StyleParser.parse_style("dashed=true")["dashed"] is True
+    assert type(StyleParser.parse_style("dashed=1.0;")["dashed"]) is float
+
+
+def test_create_style():
+    style_str = "ellipse;fillColor=#f5f5f5;opacity=50;strokeWidth=1.5"
+    assert StyleParser.create_style(StyleParser.parse_style(style_str)) == style_str
+    assert (
+        StyleParser.create_style({"fillColor": "#f5f5f5", "baseStyle": "ellipse"})
+        == "ellipse;fillColor=#f5f5f5"
+    )
+    assert StyleParser.create_style({"baseStyle": None, "rounded": 1}) == "rounded=1"
+    assert StyleParser.create_style({}) == ""
+
+
+def test_get_style_value():
+    assert StyleParser.get_style_value(STYLE, "opacity") == 50
+    assert StyleParser.get_style_value(STYLE, "strokeColor", "none") == "none"
+    assert StyleParser.get_style_value("", "opacity", 100) == 100
+    assert StyleParser.get_style_value(STYLE, "baseStyle") == "ellipse"
+    assert StyleParser.get_style_value("rounded=1", "baseStyle", "none") == "none"
+    assert StyleParser.get_style_value(STYLE, "dashed") is True
+    assert StyleParser.get_style_value("opacity=1;opacity=2", "opacity") == 2
+
+
+def test_set_style_value():
+    assert (
+        StyleParser.set_style_value(STYLE, "fillColor", "#ff0000")
+        == "ellipse;fillColor=#ff0000;opacity=50;strokeWidth=1.5;dashed=true"
+    )
+    assert (
+        StyleParser.set_style_value(STYLE, "rounded", 1)
+        == "ellipse;fillColor=#f5f5f5;opacity=50;strokeWidth=1.5;dashed=true;rounded=1"
+    )
+    assert StyleParser.set_style_value("", "rounded", 1) == "rounded=1"
+    assert StyleParser.set_style_value("a=1;b=2;a=3", "a", 5) == "a=5;b=2"
+
+
+def test_remove_style_value():
+    assert (
+        StyleParser.remove_style_value(STYLE, "opacity")
+        == "ellipse;fillColor=#f5f5f5;strokeWidth=1.5;dashed=true"
+    )
+    assert StyleParser.remove_style_value("xColor=1;Color=2", "Color") == "xColor=1"
+    assert StyleParser.remove_style_value("a=1;b=2;a=3", "a") == "b=2"
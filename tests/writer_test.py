@@ -0,0 +1,139 @@
+import pytest
+
+import drawpyo
+from drawpyo.reader import DrawioReader
+from drawpyo.writer import DrawioWriter
+
+
+def sample_file():
+    file = drawpyo.File()
+    page = drawpyo.Page(file=file, name="Flow")
+    source = drawpyo.diagram.Object(
+        page=page, value="Source", position=(0, 0), width=100, height=50
+    )
+    source.apply_style_string("rounded=1;fillColor=#dae8fc;")
+    target = drawpyo.diagram.Object(
+        page=page, value="Target", position=(300, 200), width=100, height=50
+    )
+    drawpyo.diagram.Edge(page=page, source=source, target=target, label="Link")
+    return file
+
+
+@pytest.mark.parametrize("compress_content", [True, False])
+def test_write_file_round_trip(tmp_path, compress_content):
+    file_path = tmp_path / "out.drawio"
+    writer = DrawioWriter(compress_content=compress_content)
+    assert writer.write_file(sample_file(), str(file_path))
+
+    (page,) = DrawioReader.read_file(str(file_path)).pages
+    assert page.name == "Flow"
+    source, target, edge = page.objects[2:]
+
+    assert (source.value, target.value, edge.value) == ("Source", "Target", "Link")
+    assert source.fillColor == "#dae8fc"
+    assert target.position == (300, 200)
+    assert (target.width, target.height) == (100, 50)
+    assert edge.source is source
+    assert edge.target is target
+
+
+def test_uncompressed_diagram_holds_graph_model():
+    import xml.etree.ElementTree as ET
+
+    xml_string = DrawioWriter(compress_content=False).convert_file_to_xml(sample_file())
+    (diagram,) = ET.fromstring(xml_string)
+    (graph_model,) = diagram
+    assert graph_model.tag == "mxGraphModel"
+    assert len(graph_model.find("root")) == 5
+
+
+def test_write_file_pages_in_order(tmp_path):
+    file_path = tmp_path / "out.drawio"
+    file = sample_file()
+    drawpyo.Page(file=file, name='Notes & "more"')
+    assert DrawioWriter().write_file(file, str(file_path))
+
+    pages = DrawioReader.read_file(str(file_path)).pages
+    assert [page.name for page in pages] == ["Flow", 'Notes & "more"']
+    assert len(pages[0].objects) == 5
+
+
+def test_compressed_page_keeps_non_ascii_text(tmp_path):
+    file_path = tmp_path / "out.drawio"
+    file = sample_file()
+    file.pages[0].objects[2].value = "Größe → 5 µm"
+    assert DrawioWriter().write_file(file, str(file_path))
+
+    (page,) = DrawioReader.read_file(str(file_path)).pages
+    assert page.objects[2].value == "Größe → 5 µm"
+
+
+def test_geometry_numbers():
+    import xml.etree.ElementTree as ET
+
+    file = sample_file()
+    source, target = file.pages[0].objects[2:4]
+    source.position = (12.0, 0.25)
+    target.width = 1234567
+    xml_string = DrawioWriter(compress_content=False).convert_file_to_xml(file)
+    source_geometry, target_geometry, _ = ET.fromstring(xml_string).iter("mxGeometry")
+
+    assert source_geometry.attrib["x"] == "12"
+    assert source_geometry.attrib["y"] == "0.25"
+    assert target_geometry.attrib["width"] == "1234567"
+
+
+def test_modified_timestamp(tmp_path):
+    import xml.etree.ElementTree as ET
+
+    writer = DrawioWriter()
+    xml_string = writer.convert_file_to_xml(
+        sample_file(), modified="2024-05-01T12:00:00"
+    )
+    assert ET.fromstring(xml_string).attrib["modified"] == "2024-05-01T12:00:00"
+
+    file_path = tmp_path / "out.drawio"
+    writer.write_file(sample_file(), str(file_path), modified="2024-05-01T12:00:00")
+    root = ET.parse(str(file_path)).getroot()
+    assert root.attrib["modified"] == "2024-05-01T12:00:00"
+
+
+def test_write_file_error_raises(tmp_path):
+    with pytest.raises(ValueError):
+        DrawioWriter().write_file(
+            sample_file(), str(tmp_path / "missing" / "out.drawio")
+        )
+
+
+def test_compression_level(tmp_path):
+    import xml.etree.ElementTree as ET
+
+    fast = DrawioWriter(compression_level=1).convert_file_to_xml(sample_file())
+    stored = DrawioWriter(compression_level=0).convert_file_to_xml(sample_file())
+    fast_text = ET.fromstring(fast)[0].text
+    stored_text = ET.fromstring(stored)[0].text
+    assert len(fast_text) < len(stored_text)
+
+    file_path = tmp_path / "out.drawio"
+    DrawioWriter(compression_level=1).write_file(sample_file(), str(file_path))
+    page = DrawioReader.read_file(str(file_path)).pages[0]
+    assert [obj.value for obj in page.objects[2:]] == [
+        "Source",
+        "Target",
+        "Link",
+    ]
+
+
+def test_failed_write_keeps_existing_file(tmp_path):
+    file_path = tmp_path / "out.drawio"
+    DrawioWriter().write_file(sample_file(), str(file_path))
+    original = file_path.read_bytes()
+
+    file = sample_file()
+    broken = drawpyo.Page(file=file, name="Broken")
+    drawpyo.diagram.Object(page=broken, value=5)
+    with pytest.raises(ValueError):
+        DrawioWriter().write_file(file, str(file_path))
+
+    assert file_path.read_bytes() == original
+    assert [path.name for path in tmp_path.iterdir()] == ["out.drawio"]